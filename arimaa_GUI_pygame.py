@@ -4,6 +4,8 @@ from arimaa_game_logic import ArimaaGame
 # Dimensiones de la ventana
 WINDOW_SIZE = 800
 CELL_SIZE = WINDOW_SIZE // 8
+PANEL_RECT = (0, WINDOW_SIZE, WINDOW_SIZE, 100)  # Botones y turno bajo el tablero
+FPS = 30  # Tope de fotogramas por segundo
 
 # Colores
 WHITE = (255, 255, 255)
@@ -20,7 +22,6 @@ TRAP_POSITIONS = [(2, 2), (2, 5), (5, 2), (5, 5)]
 class ArimaaPygame:
     def __init__(self):
         pygame.init()
-        self.game = ArimaaGame()
         self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + 100))  # Espacio extra para el label
         pygame.display.set_caption("Arimaa Game")
         self.font = pygame.font.SysFont(None, 30)
@@ -49,7 +50,46 @@ class ArimaaPygame:
             "a": "assets/white/camel-head.png",
             "r": "assets/white/rabbit.png"
         }
-        self.game = ArimaaGame(gui=self) 
+        # Imágenes ya escaladas al tamaño de casilla: se decodifican una sola vez
+        self.sprites = self.load_sprites(CELL_SIZE)
+        self.clock = pygame.time.Clock()
+        # Lo último que se dibujó; None obliga a redibujar toda la ventana
+        self.drawn_board = None
+        self.drawn_frozen = 0
+        self.drawn_info = None
+        self.game = ArimaaGame()
+        self.game.add_observer(self.render)  # Muestra cada paso de la IA
+        # La IA busca en un hilo y piensa durante el turno del jugador: la ventana no se congela
+        self.game.ai_async = True
+        self.game.ai_ponder = True
+
+    def load_sprites(self, cell_size):
+        """Carga y escala las imágenes de las piezas para un tamaño de casilla."""
+        sprites = {}
+        for piece, path in self.piece_assets.items():
+            image = pygame.image.load(path).convert_alpha()
+            sprites[piece] = pygame.transform.smoothscale(image, (cell_size, cell_size))
+        return sprites
+
+    def draw_square(self, row, col):
+        """Dibuja una casilla con su pieza; devuelve su rectángulo."""
+        rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        if (row, col) in TRAP_POSITIONS:
+            color = BLACK
+        else:
+            color = BROWN if (row + col) % 2 == 0 else BROWN2
+        pygame.draw.rect(self.screen, color, rect)
+        piece = self.game.board[row][col]
+        if piece:
+            self.screen.blit(self.sprites[piece], rect)
+            self.draw_frozen_mark(row, col)
+        return rect
+
+    def draw_frozen_mark(self, row, col):
+        """Recuadra en rojo la pieza si está congelada (según el mapa de la posición)."""
+        if self.game.position.is_frozen(row * 8 + col):
+            rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            pygame.draw.rect(self.screen, RED, rect, 3)
 
     def draw_board(self):
         """Dibuja el tablero de juego."""
@@ -63,6 +103,7 @@ class ArimaaPygame:
                 pygame.draw.rect(self.screen, color, rect)
 
         # Dibuja los botones y el turno actual
+        self.screen.fill(BLACK, PANEL_RECT)
         self.draw_buttons()
         self.draw_turn_info()
 
@@ -77,13 +118,21 @@ class ArimaaPygame:
         self.screen.blit(self.font.render("Empujar", True, BLACK), (self.push_button.x + 10, self.push_button.y + 10))
         self.screen.blit(self.font.render("Jalar", True, BLACK), (self.pull_button.x + 10, self.pull_button.y + 10))
 
-    def draw_turn_info(self):
-        """Dibuja la información del turno actual y movimientos restantes."""
+    def turn_info_text(self):
+        if self.game.result is not None:
+            return f"{self.game.result.message()} | Juego terminado"
         current_turn = "White" if self.game.current_player == "white" else "Black"
+        if self.game.ai_busy():
+            return f"Turno: {current_turn} | La IA está pensando..."
         moves_left = 4 - self.game.steps_taken
-        info_text = f"Turno: {current_turn} | Movimientos restantes: {moves_left}"
+        return f"Turno: {current_turn} | Movimientos restantes: {moves_left}"
+
+    def draw_turn_info(self):
+        """Dibuja la información del turno actual y movimientos restantes."""
+        info_text = self.turn_info_text()
         label = self.font.render(info_text, True, WHITE)
         self.screen.blit(label, (10, WINDOW_SIZE + 60))
+        self.drawn_info = info_text
 
     def draw_pieces(self):
         """Dibuja las piezas en el tablero."""
@@ -92,10 +141,39 @@ class ArimaaPygame:
             for col in range(8):
                 piece = board[row][col]
                 if piece:
-                    piece_asset = self.piece_assets[piece]
-                    piece_image = pygame.image.load(piece_asset)
-                    piece_image = pygame.transform.scale(piece_image, (CELL_SIZE, CELL_SIZE))
-                    self.screen.blit(piece_image, (col * CELL_SIZE, row * CELL_SIZE))
+                    self.screen.blit(self.sprites[piece], (col * CELL_SIZE, row * CELL_SIZE))
+                    self.draw_frozen_mark(row, col)
+        self.drawn_board = [list(row) for row in board]
+        self.drawn_frozen = self.game.position.frozen
+
+    def render(self):
+        """Actualiza la ventana redibujando solo las casillas y el panel que cambiaron."""
+        if self.drawn_board is None:
+            self.screen.fill(BLACK)
+            self.draw_board()
+            self.draw_pieces()
+            pygame.display.flip()
+            return
+        board = self.game.get_board_state()
+        frozen = self.game.position.frozen
+        # Casillas cuya pieza se congeló o descongeló sin moverse
+        changed = frozen ^ self.drawn_frozen
+        dirty = []
+        for row in range(8):
+            drawn_row = self.drawn_board[row]
+            for col in range(8):
+                if board[row][col] != drawn_row[col] or changed >> (row * 8 + col) & 1:
+                    dirty.append(self.draw_square(row, col))
+                    drawn_row[col] = board[row][col]
+        self.drawn_frozen = frozen
+        if self.turn_info_text() != self.drawn_info:
+            panel = pygame.Rect(PANEL_RECT)
+            self.screen.fill(BLACK, panel)
+            self.draw_buttons()
+            self.draw_turn_info()
+            dirty.append(panel)
+        if dirty:
+            pygame.display.update(dirty)
 
     def get_clicked_position(self, pos):
         """Devuelve la posición de la celda clicada."""
@@ -109,6 +187,10 @@ class ArimaaPygame:
         for event in pygame.event.get():
             if event.type == pygame.QUIT: # Salir del juego
                 self.running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.drawn_board = None  # La ventana se volvió a mostrar: redibujar todo
+            elif self.game.ai_busy() or self.game.result is not None:
+                continue  # Mientras la IA piensa o con la partida terminada solo se atiende la salida
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if self.pass_turn_button.collidepoint(event.pos): # Pasar turno
                     self.pass_turn()
@@ -230,12 +312,12 @@ class ArimaaPygame:
         """Bucle principal del juego."""
         while self.running:
             self.handle_events()
-            self.screen.fill(BLACK)
-            self.draw_board()
-            self.draw_pieces()
-            pygame.display.flip()
+            self.game.poll_ai()  # Juega el turno de la IA cuando su búsqueda termina
+            self.render()
+            self.clock.tick(FPS)  # Duerme el resto del fotograma en lugar de girar en vacío
 
 if __name__ == "__main__":
     gui = ArimaaPygame()
     gui.run()
+    gui.game.close()
     pygame.quit()
\ No newline at end of file
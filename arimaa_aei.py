@@ -0,0 +1,251 @@
+# arimaa_aei.py - Motor para herramientas de partidas por el protocolo AEI (stdin/stdout)
+#
+# Uso: python arimaa_aei.py
+# Un hilo lee la entrada y deja cada línea en una cola; el bucle principal las
+# atiende mientras la búsqueda corre en un SearchJob, así que "stop" detiene la
+# búsqueda al momento y se responde con el mejor turno encontrado hasta entonces.
+import queue
+import sys
+import threading
+
+from arimaa_ai import configure_transposition_table, find_best_turn, iter_turns, TURN_SEARCH_DEPTH
+from arimaa_game_logic import ArimaaGame
+from arimaa_jobs import SearchJob
+from arimaa_moves import decode_turn
+from arimaa_notation import (
+    SIDE_NAMES, STANDARD_SETUP, board_from_aei, is_setup, notation_to_turn, parse_setup, turn_to_notation,
+)
+
+ENGINE_NAME = "arimaa_ai"
+ENGINE_AUTHOR = "RamSterB"
+POLL_INTERVAL = 0.01  # Segundos entre comprobaciones de la búsqueda en curso
+RESERVE_FRACTION = 0.1  # Parte de la reserva que se puede gastar en un turno
+SAFETY_MARGIN = 0.2  # Segundos que se dejan para comunicar la jugada
+MIN_SEARCH_TIME = 0.05
+
+# Opciones de control de tiempo (segundos) y de búsqueda con sus valores por defecto
+DEFAULT_OPTIONS = {
+    "tcmove": 0, "tcreserve": 0, "tcpercent": 100, "tcmax": 0, "tctotal": 0, "tcturns": 0,
+    "tcturntime": 0, "greserve": 0, "sreserve": 0, "gused": 0, "sused": 0, "moveused": 0,
+    "lastmoveused": 0, "depth": 0, "hash": 0,
+}
+
+
+def first_legal_turn(position, player):
+    """Primer turno legal de `player` con el generador completo (lista de tuplas), o [] si no hay."""
+    turns = iter_turns(position.copy(), player, selective=False)
+    try:
+        turn = next(turns, None)
+    finally:
+        turns.close()
+    return decode_turn(turn) if turn else []
+
+
+class AEIEngine:
+    """Estado de la partida y atención de los comandos AEI."""
+
+    def __init__(self, input=sys.stdin, output=sys.stdout):
+        self.input = input
+        self.output = output
+        self.game = ArimaaGame()
+        self.options = dict(DEFAULT_OPTIONS)
+        self.lines = queue.Queue()
+        self.job = None
+        self.job_position = None  # Posición de la búsqueda en curso, para escribir la jugada
+        self.pondering = False
+        self.new_game()
+
+    def send(self, text):
+        self.output.write(text + "\n")
+        self.output.flush()
+
+    def log(self, text):
+        self.send("log " + text)
+
+    # --- Estado de la partida -------------------------------------------------
+
+    def new_game(self):
+        """Tablero vacío: primero coloca Gold (Black) y luego Silver (White)."""
+        self.game.board = [[None for _ in range(8)] for _ in range(8)]
+        self.game.current_player = "black"
+        self.game.steps_taken = 0
+
+    def set_position(self, side, board_text):
+        self.game.board = board_from_aei(board_text)
+        self.game.current_player = SIDE_NAMES[side]
+        self.game.steps_taken = 0
+
+    def make_move(self, text):
+        """Aplica un turno (o una colocación inicial) del jugador al que le toca."""
+        player = self.game.current_player
+        if is_setup(text):
+            board = self.game.board
+            for piece, (row, col) in parse_setup(text):
+                board[row][col] = piece
+            self.game.board = board  # Reconstruye la posición del juego
+        else:
+            position = self.game.position.copy()
+            for move in notation_to_turn(position, player, text):
+                position.make_step(move)
+            self.game.board = position.to_board()
+        self.game.current_player = "white" if player == "black" else "black"
+        self.game.steps_taken = 0
+
+    def needs_setup(self):
+        uppercase = self.game.current_player == "black"
+        return not any(piece and piece.isupper() == uppercase for row in self.game.board for piece in row)
+
+    def time_for_move(self):
+        """Segundos para el turno según las opciones de tiempo; None si la partida no tiene reloj."""
+        options = self.options
+        if not options["tcmove"] and not options["tcturntime"]:
+            return None
+        reserve = options["greserve"] if self.game.current_player == "black" else options["sreserve"]
+        seconds = options["tcmove"] + reserve * RESERVE_FRACTION
+        if options["tcmax"]:
+            seconds = min(seconds, options["tcmax"])
+        if options["tcturntime"]:
+            seconds = min(seconds, options["tcturntime"])
+        return max(MIN_SEARCH_TIME, seconds - options["moveused"] - SAFETY_MARGIN)
+
+    # --- Búsqueda -------------------------------------------------------------
+
+    def go(self, ponder=False):
+        self.cancel_search()
+        position = self.game.position.copy()
+        player = self.game.current_player
+        self.pondering = ponder
+        if ponder:
+            # Se piensa en el turno del rival y en la respuesta; la tabla conserva el trabajo
+            self.job = SearchJob(find_best_turn, position, player, depth=TURN_SEARCH_DEPTH + 1,
+                                 searcher=self.game.get_searcher())
+            return
+        if self.needs_setup():
+            self.send("bestmove " + STANDARD_SETUP[player])
+            return
+        depth = self.options["depth"] or None
+        self.job = SearchJob(find_best_turn, position, player, depth=depth, return_stats=True,
+                             time_limit=self.time_for_move(), searcher=self.game.get_searcher())
+        self.job_position = position
+
+    def poll_search(self):
+        """Si la búsqueda de "go" terminó, envía la jugada."""
+        if self.job is not None and self.job.done():
+            self.finish_search()
+
+    def finish_search(self):
+        job, self.job = self.job, None
+        if self.pondering:
+            self.pondering = False
+            job.result()
+            return
+        turn, stats = job.result()
+        self.send(f"info depth {stats.depth}")
+        if stats.value is not None:
+            sign = 1 if self.game.current_player == "black" else -1
+            self.send(f"info score {round(stats.value * sign)}")  # Unidades de evaluate_board
+        self.send(f"info nodes {stats.nodes}")
+        self.send(f"info time {stats.elapsed:.2f}")
+        if not turn:
+            turn = first_legal_turn(self.job_position, self.game.current_player)
+            if not turn:
+                # Sin turnos legales la partida está perdida y AEI no tiene abandono: no se
+                # responde una jugada vacía, el controlador da la derrota
+                self.log(f"Error: {self.game.current_player} no tiene turnos legales; abandona.")
+                return
+            self.log("La búsqueda no devolvió turno; se juega el primer turno legal.")
+        self.send("bestmove " + turn_to_notation(self.job_position, turn))
+
+    def stop(self):
+        """Detiene la búsqueda; con "go" responde con el mejor turno encontrado."""
+        if self.job is not None:
+            self.job.cancel()
+            self.finish_search()
+
+    def cancel_search(self):
+        """Descarta la búsqueda en curso sin responder (p. ej. al llegar un nuevo turno)."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job.result()
+            self.job = None
+            self.pondering = False
+
+    # --- Protocolo ------------------------------------------------------------
+
+    def set_option(self, args):
+        # setoption name <nombre> [value <valor>]
+        if len(args) < 2 or args[0] != "name":
+            raise ValueError("setoption inválido.")
+        name = args[1]
+        value = args[3] if len(args) >= 4 and args[2] == "value" else None
+        if name not in self.options:
+            self.log(f"Opción desconocida: {name}")
+            return
+        self.options[name] = float(value) if value is not None else 0
+        if name == "hash" and self.options["hash"]:
+            configure_transposition_table(int(self.options["hash"]))
+        elif name == "depth":
+            self.options["depth"] = int(self.options["depth"])
+
+    def handle(self, line):
+        """Atiende un comando; devuelve False para terminar."""
+        command, _, rest = line.partition(" ")
+        if command == "aei":
+            self.send("protocol-version 1")
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("aeiok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "newgame":
+            self.cancel_search()
+            self.new_game()
+        elif command == "setposition":
+            self.cancel_search()
+            side, _, board_text = rest.partition(" ")
+            self.set_position(side, board_text)
+        elif command == "setoption":
+            self.set_option(rest.split())
+        elif command == "makemove":
+            self.cancel_search()
+            self.make_move(rest)
+        elif command == "go":
+            self.go(ponder=rest.strip() == "ponder")
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.cancel_search()
+            return False
+        elif command:
+            self.log(f"Comando desconocido: {command}")
+        return True
+
+    def read_input(self):
+        for line in self.input:
+            self.lines.put(line.strip())
+        self.lines.put(None)
+
+    def run(self):
+        threading.Thread(target=self.read_input, daemon=True).start()
+        try:
+            while True:
+                try:
+                    line = self.lines.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    self.poll_search()
+                    continue
+                if line is None:
+                    break
+                try:
+                    if not self.handle(line):
+                        break
+                except ValueError as e:
+                    self.log(f"Error: {e}")
+                self.poll_search()
+        finally:
+            self.cancel_search()
+            self.game.close()
+
+
+if __name__ == "__main__":
+    AEIEngine().run()
@@ -1,234 +1,873 @@
 # arimaa_ai.py - Refactorizado
-from arimaa_utils import is_frozen, is_enemy, get_piece_strength, push_piece, pull_piece
-
-def evaluate_board(board):
-
-    piece_values = {
-        "E": 5, "C": 1, "H": 3, "D": 2, "A": 4, "R": 0,  # Black (mayúsculas)
-        "e": -5, "c": -1, "h": -3, "d": -2, "a": -4, "r": 0  # White (minúsculas)
-    }
-    
-    trap_positions = [(2, 2), (2, 5), (5, 2), (5, 5)]
-    black_goal_row = 7
-    white_goal_row = 0
-
-    value = 0
-    for row_idx, row in enumerate(board):
-        for col_idx, piece in enumerate(row):
-            if piece in piece_values:
-                
-                if piece.upper() == "R":
-                    distance_to_goal = (
-                        black_goal_row - row_idx if piece.isupper() else row_idx - white_goal_row
-                    )
-                    value += 7 - distance_to_goal
-
-                if (row_idx, col_idx) in trap_positions and board[row_idx][col_idx] is not None:
-                   
-                    # Direcciones adyacentes
-                    adjacent_positions = [
-                        (row_idx-1, col_idx),  # arriba
-                        (row_idx+1, col_idx),  # abajo
-                        (row_idx, col_idx-1),  # izquierda
-                        (row_idx, col_idx+1)   # derecha
-                    ]
-                    
-                    has_friendly_adjacent = False
-                    for adj_pos in adjacent_positions:
-                        adj_row, adj_col = adj_pos
-                        # Verificar que la posición está dentro del tablero
-                        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
-                            # Verificar si hay una pieza aliada en posición adyacente
-                            if board[adj_row][adj_col] is not None and board[adj_row][adj_col].islower() and board[row_idx][col_idx].islower():
-                                has_friendly_adjacent = True
-                                break
-                            if board[adj_row][adj_col] is not None and board[adj_row][adj_col].isupper() and board[row_idx][col_idx].isupper():
-                                has_friendly_adjacent = True
-                                break
-                    
-                    # Bonificar si no hay piezas enemigas adyacentes lower
-                    if not has_friendly_adjacent and board[row_idx][col_idx].islower():
-                        value += 20
-                    # Penalizar si no hay piezas aliadas adyacentes
-                    if not has_friendly_adjacent and board[row_idx][col_idx].isupper():
-                        value -= 20
-
-    mobility_black = len(generate_moves(board, "black"))
-    mobility_white = len(generate_moves(board, "white"))
-    value += (mobility_black - mobility_white) * 0.2
-
-    return value
-
-def has_adjacent_ally(board, current_pos, new_pos, player):
-    current_row, current_col = current_pos
-    row, col = new_pos
-    for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-        adj_row, adj_col = row + dr, col + dc
-        if 0 <= adj_row < 8 and 0 <= adj_col < 8 and adj_row != current_row and adj_col != current_col:
-            piece = board[adj_row][adj_col]
-            if piece:
-                if player == "white" and piece.islower():        
-                    return True
-                if player == "black" and piece.isupper():
-                    return True
-    return False
-
-def generate_moves(board, player):
-    moves = []
-    traps = [(2,2), (2,5), (5,2), (5,5)]
-
-    for row in range(8):
-        for col in range(8):
-            piece = board[row][col]
-            if piece and ((player == "white" and piece.islower()) or 
-                          (player == "black" and piece.isupper())):
-                if not is_frozen(board, (row, col)):
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        if (piece.lower() == 'r' and 
-                            ((player == "white" and dr == 1) or  
-                             (player == "black" and dr == -1))): 
-                            continue
-                            
-                        new_row, new_col = row + dr, col + dc
-                        if (0 <= new_row < 8 and 0 <= new_col < 8 and 
-                            board[new_row][new_col] is None):
-                            # Verificar si el movimiento es hacia una trampa
-                            if (new_row, new_col) in traps:
-                                # Solo añadir el movimiento si hay un aliado adyacente
-                                if has_adjacent_ally(board,(row, col), (new_row, new_col), player):
-                                    moves.append(((row, col), (new_row, new_col)))
-                            else:
-                                moves.append(((row, col), (new_row, new_col)))
-                    moves.extend(generate_push_pull_moves(board, (row, col), piece))
-    return moves
+import logging
+
+from arimaa_bitboard import (
+    Position, BLACK, WHITE, COLORS, RABBIT, CENTER_MASK, STEP_NEIGHBORS, ZOBRIST_SIDE, ZOBRIST_TURN,
+    iter_bits,
+)
+from arimaa_tables import NEIGHBORS, NEIGHBOR_MASKS, TRAP_SQUARES, TRAP_MASK, TRAP_GUARD_MASK
+from arimaa_moves import (
+    AFFECTED_SHIFT, DESTINATION_SHIFT, PULL, PUSH, TYPE_MASK, TYPE_SHIFT, MoveBuffers, decode_move,
+    decode_turn, encode_move, encode_pull, encode_push, encode_step, new_move_buffer, with_captures,
+)
+from arimaa_transposition import TranspositionTable, EXACT, LOWER, UPPER
+from arimaa_budget import SearchBudget, SearchAborted
+from arimaa_eval import (
+    MOBILITY_WEIGHT, PUSH_PULL_CAPTURE_BONUS, PUSH_PULL_CAPTURE_WEIGHT, PUSH_PULL_CENTER_WEIGHT,
+    PUSH_PULL_TRAP_WEIGHT, WEIGHT_NAMES,
+)
+from arimaa_ordering import MoveOrderer
+from arimaa_stats import SearchStats, SearchProfiler
+from arimaa_goal import WIN_VALUE, goal_distance, goal_in
+
+logger = logging.getLogger(__name__)  # Sin configurar no se registra nada
+
+SEARCH_DEPTH = 3
+TURN_SEARCH_DEPTH = 1  # En turnos completos
+MAX_STEPS = 4
+MAX_ITERATIVE_DEPTH = 32  # Tope de la profundización iterativa cuando hay presupuesto
+QUIESCENCE_DEPTH = 6  # Pasos tácticos como máximo más allá del horizonte
+QUIESCENCE_NODE_LIMIT = 200  # Nodos de quiescencia por hoja del horizonte (0 la desactiva)
+
+# Compartida entre búsquedas; se dimensiona con configure_transposition_table
+transposition_table = TranspositionTable()
+# Killers e historia; la historia se conserva entre búsquedas
+move_orderer = MoveOrderer()
+# Un búfer de movimientos por ply para minimax y turn_minimax (una búsqueda a la vez, como la tabla)
+move_buffers = MoveBuffers(SEARCH_DEPTH + 1)
+# Contadores de la búsqueda en curso; find_best_move/find_best_turn crean uno nuevo
+search_stats = SearchStats()
+# Evaluación por lotes de los hijos de los nodos de profundidad 1 (ver configure_batch_eval)
+evaluate_children = None
+batch_min_moves = 0
+
+
+def configure_transposition_table(size_mb):
+    """Reemplaza la tabla de transposición por una nueva con el límite de memoria indicado."""
+    global transposition_table
+    transposition_table = TranspositionTable(size_mb)
+    return transposition_table
+
+
+def configure_batch_eval(enabled=True):
+    """Activa o desactiva la evaluación por lotes con NumPy; devuelve si quedó activa.
+
+    arimaa_batch_eval (y NumPy) solo se importan al activarla. Sin NumPy la
+    búsqueda sigue evaluando hoja a hoja. Afecta solo al proceso actual.
+    """
+    global evaluate_children, batch_min_moves
+    evaluate_children = None
+    if enabled:
+        import arimaa_batch_eval
+        if arimaa_batch_eval.HAVE_NUMPY:
+            evaluate_children = arimaa_batch_eval.evaluate_children
+            batch_min_moves = arimaa_batch_eval.BATCH_MIN_MOVES
+    return evaluate_children is not None
+
+
+def configure_evaluation(**weights):
+    """Cambia pesos de arimaa_eval en este proceso (p. ej. MOBILITY_WEIGHT=0.3); devuelve los anteriores.
+
+    Reconstruye PIECE_SQUARE y la tabla de evaluar_push_pull. Las Position ya
+    creadas conservan el `score` de los pesos anteriores (hay que recalcularlo con
+    position.score = position.compute_score()) y la tabla de transposición sus
+    valores: conviene vaciarla o usar otra.
+    """
+    global MOBILITY_WEIGHT, PUSH_PULL_CAPTURE_BONUS, PUSH_PULL_CAPTURE_WEIGHT, PUSH_PULL_CENTER_WEIGHT
+    global PUSH_PULL_TRAP_WEIGHT, PUSH_PULL_STATIC
+    import arimaa_bitboard
+    import arimaa_eval
+
+    for name in weights:
+        if name not in WEIGHT_NAMES:
+            raise ValueError(f"Peso de evaluación desconocido: {name}")
+    previous = {name: getattr(arimaa_eval, name) for name in weights}
+    for name, value in weights.items():
+        setattr(arimaa_eval, name, value)
+    arimaa_eval.PIECE_SQUARE = arimaa_bitboard.PIECE_SQUARE = arimaa_eval.build_piece_square()
+    MOBILITY_WEIGHT = arimaa_eval.MOBILITY_WEIGHT
+    PUSH_PULL_CAPTURE_BONUS = arimaa_eval.PUSH_PULL_CAPTURE_BONUS
+    PUSH_PULL_CAPTURE_WEIGHT = arimaa_eval.PUSH_PULL_CAPTURE_WEIGHT
+    PUSH_PULL_CENTER_WEIGHT = arimaa_eval.PUSH_PULL_CENTER_WEIGHT
+    PUSH_PULL_TRAP_WEIGHT = arimaa_eval.PUSH_PULL_TRAP_WEIGHT
+    PUSH_PULL_STATIC = _build_push_pull_static()
+    if evaluate_children is not None:
+        import arimaa_batch_eval
+        arimaa_batch_eval.load_weights()
+    return previous
+
 
-def generate_push_pull_moves(board, position, piece):
-    push_pull_moves = []
-    strength = get_piece_strength(piece)
-    row, col = position
-    adjacent_positions = [(row + dr, col + dc) for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]]
-
-    for adj_row, adj_col in adjacent_positions:
-        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
-            adjacent_piece = board[adj_row][adj_col]
-            if adjacent_piece and is_enemy(piece, adjacent_piece):
-                if get_piece_strength(adjacent_piece) < strength:
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        new_row, new_col = adj_row + dr, adj_col + dc
-                        if (0 <= new_row < 8 and 0 <= new_col < 8 and 
-                            board[new_row][new_col] is None):
-                            score = evaluar_push_pull(board, (row, col), (new_row, new_col))
-                            if score > 0:
-                                push_pull_moves.append(("push", (row, col), (adj_row, adj_col), (new_row, new_col)))
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        pull_row, pull_col = row + dr, col + dc
-                        if (0 <= pull_row < 8 and 0 <= pull_col < 8 and 
-                            board[pull_row][pull_col] is None):
-                            score = evaluar_push_pull(board, (row, col), (pull_row, pull_col))
-                            if score > 0:
-                                push_pull_moves.append(("pull", (row, col), (adj_row, adj_col), (pull_row, pull_col)))
-    return push_pull_moves
-
-def evaluar_push_pull(board, origin, destination):
+def search_key(position, is_maximizing_player):
+    """Clave de la tabla: posición más el jugador que mueve."""
+    return position.key ^ ZOBRIST_SIDE if is_maximizing_player else position.key
+
+
+def _manhattan_sq(a, b):
+    return abs((a >> 3) - (b >> 3)) + abs((a & 7) - (b & 7))
+
+
+def _push_pull_static_score(origin, destination):
     score = 0
-    traps = [(2,2), (2,5), (5,2), (5,5)]
-    piece_values = {
-        "E": 5, "A": 4, "H": 3, "D": 2, "C": 1, "R": 0,  # Valores para piezas negras
-        "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0   # Valores para piezas blancas
-    }
-    
-    # Verificar si el destino es una trampa
-    if destination in traps:
-        # Simular el estado después del empuje/jalón
-        has_support = False
-        affected_piece = None
-        
-        # Obtener la pieza que será empujada/jalada
-        if len(origin) == 2:
-            affected_piece = board[origin[0]][origin[1]]
-        
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            adj_row, adj_col = destination[0] + dr, destination[1] + dc
-            if 0 <= adj_row < 8 and 0 <= adj_col < 8:
-                adj_piece = board[adj_row][adj_col]
-                if adj_piece and adj_piece.isupper() == affected_piece.isupper():
-                    has_support = True
-                    break
-        
-        # Si la pieza enemiga no tendrá apoyo en la trampa
-        if not has_support and affected_piece and affected_piece.islower():
-            # Bonus por eliminar una pieza enemiga, ponderado por su valor
-            piece_value = piece_values.get(affected_piece, 0)
-            score += piece_value * 3  # Triplicamos el valor de la eliminación
-            
-            # Bonus adicional por ser una trampa
-            score += 50
-    
-    # Mantener la evaluación existente
-    for trap in traps:
-        if manhattan_distance(destination, trap) < manhattan_distance(origin, trap):
-            score += 3
-    if 2 <= destination[0] <= 5 and 2 <= destination[1] <= 5:
-        score += 3
-        
+    for trap in TRAP_SQUARES:
+        if _manhattan_sq(destination, trap) < _manhattan_sq(origin, trap):
+            score += PUSH_PULL_TRAP_WEIGHT
+    if CENTER_MASK >> destination & 1:
+        score += PUSH_PULL_CENTER_WEIGHT
+    return score
+
+
+def _build_push_pull_static():
+    return tuple(
+        tuple(_push_pull_static_score(origin, destination) for destination in range(64))
+        for origin in range(64)
+    )
+
+
+# Parte de evaluar_push_pull que solo depende del origen y del destino
+PUSH_PULL_STATIC = _build_push_pull_static()
+
+
+def evaluate_board(position):
+    """Evalúa la posición desde el punto de vista de Black.
+
+    Material, avance de conejos y seguridad en trampas vienen de `position.score`,
+    que make_step/unmake_step mantienen al día; la movilidad es un popcount de los
+    pasos simples de cada bando.
+    """
+    mobility = position.step_count(BLACK) - position.step_count(WHITE)
+    return position.score + mobility * MOBILITY_WEIGHT
+
+def generate_moves(position, player, selective=True):
+    """Movimientos de `player` como tuplas (para la GUI, la notación y las herramientas).
+
+    La búsqueda usa generate_move_codes, que escribe enteros en un búfer.
+    """
+    buffer = new_move_buffer()
+    count = generate_move_codes(position, player, buffer, selective)
+    return [decode_move(buffer[index]) for index in range(count)]
+
+
+def generate_move_codes(position, player, buffer, selective=True):
+    """Escribe en `buffer` los movimientos de `player` (enteros de arimaa_moves) y devuelve cuántos son.
+
+    Pasos simples, empujes y jalones. Con `selective` (lo que usa la búsqueda) se
+    omiten los pasos a una trampa sin aliado y los empujes/jalones que
+    evaluar_push_pull no puntúa; con selective=False se generan todos los legales.
+    """
+    count = 0
+    color = COLORS[player]
+    squares = position.squares
+    own = position.occupied[color]
+    empty = ~(own | position.occupied[1 - color])
+    movers = own & ~position.frozen
+
+    while movers:
+        low = movers & -movers
+        movers ^= low
+        sq = low.bit_length() - 1
+        piece = squares[sq]
+        strength = piece % 6
+        for target in STEP_NEIGHBORS[color][strength == RABBIT][sq]:
+            if empty >> target & 1:
+                # Solo se entra en una trampa si hay un aliado adyacente
+                if selective and TRAP_MASK >> target & 1 and not NEIGHBOR_MASKS[target] & own & ~low:
+                    continue
+                buffer[count] = sq | target << DESTINATION_SHIFT
+                count += 1
+        if strength == RABBIT:
+            continue
+        for adj in NEIGHBORS[sq]:
+            victim = squares[adj]
+            if victim is None or victim // 6 == color or victim % 6 >= strength:
+                continue
+            push = sq | adj << AFFECTED_SHIFT | PUSH << TYPE_SHIFT
+            for target in NEIGHBORS[adj]:
+                if empty >> target & 1 and (not selective or evaluar_push_pull(position, sq, target) > 0):
+                    buffer[count] = push | target << DESTINATION_SHIFT
+                    count += 1
+            pull = sq | adj << AFFECTED_SHIFT | PULL << TYPE_SHIFT
+            for target in NEIGHBORS[sq]:
+                if empty >> target & 1 and (not selective or evaluar_push_pull(position, sq, target) > 0):
+                    buffer[count] = pull | target << DESTINATION_SHIFT
+                    count += 1
+    return count
+
+
+def evaluar_push_pull(position, origin, destination):
+    score = PUSH_PULL_STATIC[origin][destination]
+    affected_piece = position.squares[origin]
+
+    # Bonus por dejar la pieza sin apoyo en una trampa
+    if TRAP_MASK >> destination & 1 and affected_piece is not None and affected_piece // 6 == WHITE:
+        if not NEIGHBOR_MASKS[destination] & position.occupied[WHITE]:
+            score += (affected_piece % 6) * PUSH_PULL_CAPTURE_WEIGHT
+            score += PUSH_PULL_CAPTURE_BONUS
+
     return score
 
 def manhattan_distance(pos1, pos2):
     return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
-def apply_move(board, move):
-    new_board = [row[:] for row in board]
-    if len(move) == 2:
-        start, end = move
-        new_board[end[0]][end[1]] = new_board[start[0]][start[1]]
-        new_board[start[0]][start[1]] = None
-    elif len(move) == 4:
-        move_type, origin, affected, destination = move
-        if move_type == "push":
-            push_piece(new_board, origin, affected, destination)
-        elif move_type == "pull":
-            pull_piece(new_board, origin, affected, destination)
-    return new_board
-
-def minimax(board, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf')):
+def apply_move(position, move):
+    """Devuelve una copia de la posición con el movimiento aplicado (fuera del bucle de búsqueda)."""
+    new_position = position.copy()
+    new_position.make_step(move)
+    return new_position
+
+def minimax(position, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf'), budget=None, ply=0,
+            static=None):
+    """Alfa-beta sobre una única posición mutable: cada hijo se aplica con make_step y se deshace.
+
+    `static` es la evaluación de la posición si ya se calculó por lotes (solo en las hojas).
+    """
+    if budget is not None:
+        budget.tick()
+    # En esta búsqueda cada paso es una jugada: el final se mira tras la del rival
+    value = terminal_value(position, WHITE if is_maximizing_player else BLACK)
+    if value is not None:
+        return value
+    table = transposition_table
+    key = search_key(position, is_maximizing_player)
+    entry = table.probe(key)
+    tt_move = None
+    if entry is not None:
+        tt_move = entry[4]
+        if entry[1] == depth or (entry[1] > depth and not table.exact_depth_only):
+            flag, score = entry[2], entry[3]
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score
+
     if depth == 0:
-        return evaluate_board(board)
+        value = quiesce(position, is_maximizing_player, alpha, beta, budget, static=static)
+        flag = LOWER if value >= beta else UPPER if value <= alpha else EXACT
+        table.store(key, 0, flag, value, None)
+        return value
 
-    moves = generate_moves(board, "black" if is_maximizing_player else "white")
+    buffer = move_buffers[ply]
+    count = generate_move_codes(position, "black" if is_maximizing_player else "white", buffer)
+    orderer = move_orderer
+    moves = orderer.order(position, buffer[:count], tt_move, ply)
+    # Los hijos de un nodo de profundidad 1 son hojas: se evalúan todos en una llamada
+    statics = None
+    if depth == 1 and evaluate_children is not None and count >= batch_min_moves:
+        statics = evaluate_children(position, moves)
 
+    alpha_orig, beta_orig = alpha, beta
+    best_move = None
     if is_maximizing_player:
         max_eval = float('-inf')
-        for move in moves:
-            new_board = apply_move(board, move)
-            eval = minimax(new_board, depth - 1, False, alpha, beta)
-            max_eval = max(max_eval, eval)
+        for index, move in enumerate(moves):
+            undo = position.make_step(move)
+            eval = minimax(position, depth - 1, False, alpha, beta, budget, ply + 1,
+                           statics[index] if statics else None)
+            position.unmake_step(undo)
+            if eval > max_eval or best_move is None:
+                max_eval = eval
+                best_move = move
             alpha = max(alpha, eval)
             if beta <= alpha:
+                search_stats.cutoffs += 1
+                orderer.record_cutoff(position, move, depth, ply, index)
                 break
+        flag = LOWER if max_eval >= beta_orig else UPPER if max_eval <= alpha_orig else EXACT
+        table.store(key, depth, flag, max_eval, best_move)
         return max_eval
     else:
         min_eval = float('inf')
-        for move in moves:
-            new_board = apply_move(board, move)
-            eval = minimax(new_board, depth - 1, True, alpha, beta)
-            min_eval = min(min_eval, eval)
+        for index, move in enumerate(moves):
+            undo = position.make_step(move)
+            eval = minimax(position, depth - 1, True, alpha, beta, budget, ply + 1,
+                           statics[index] if statics else None)
+            position.unmake_step(undo)
+            if eval < min_eval or best_move is None:
+                min_eval = eval
+                best_move = move
             beta = min(beta, eval)
             if beta <= alpha:
+                search_stats.cutoffs += 1
+                orderer.record_cutoff(position, move, depth, ply, index)
                 break
+        flag = UPPER if min_eval <= alpha_orig else LOWER if min_eval >= beta_orig else EXACT
+        table.store(key, depth, flag, min_eval, best_move)
         return min_eval
 
 
-def find_best_move(board, player):
-    best_move = None
-    best_value = float('-inf') if player == "black" else float('inf')
-    moves = generate_moves(board, player)
-    print(moves)
+def generate_capture_moves(position, color):
+    """Empujes y jalones de `color` que capturan una pieza rival, con las trampas anotadas en el entero."""
+    return [with_captures(move, traps) for move, traps in _capture_moves(position, color)]
+
+
+def _capture_moves(position, color):
+    """[(movimiento, trampas donde cae una pieza rival)] para `color`, con movimientos enteros.
+
+    Toda captura mueve una pieza rival que está junto a una trampa: o la lleva a
+    la trampa o era el último apoyo de otra pieza rival que está en ella. Se
+    decide sin aplicar el movimiento, mirando el apoyo rival tras el paso.
+    """
+    enemy = 1 - color
+    squares = position.squares
+    occupied = position.occupied
+    enemies = occupied[enemy]
+    victims = enemies & TRAP_GUARD_MASK
+    if not victims:
+        return []
+    empty = ~(occupied[BLACK] | occupied[WHITE])
+    movers = None
+    captures = []
+    for adj in iter_bits(victims):
+        strength = squares[adj] % 6
+        pushers = [sq for sq in NEIGHBORS[adj] if occupied[color] >> sq & 1 and squares[sq] % 6 > strength]
+        if not pushers:
+            continue
+        if movers is None:
+            movers = occupied[color] & ~position.frozen
+        others = enemies & ~(1 << adj)
+        # Trampas con pieza rival que hoy apoya esta pieza
+        supported = [trap for trap in NEIGHBORS[adj] if TRAP_MASK >> trap & 1 and others >> trap & 1]
+        for sq in pushers:
+            if not movers >> sq & 1:
+                continue
+            landings = [(encode_push(sq, adj, target), target) for target in NEIGHBORS[adj] if empty >> target & 1]
+            landings += [(encode_pull(sq, adj, target), sq) for target in NEIGHBORS[sq] if empty >> target & 1]
+            # `landing` es donde acaba la pieza rival: el destino al empujar, la casilla del que jala al jalar
+            for move, landing in landings:
+                support = others | 1 << landing
+                traps = [trap for trap in supported if not NEIGHBOR_MASKS[trap] & support]
+                if TRAP_MASK >> landing & 1 and not NEIGHBOR_MASKS[landing] & others:
+                    traps.append(landing)
+                if traps:
+                    captures.append((move, traps))
+    return captures
+
+
+def generate_quiescence_moves(position, player):
+    """Capturas de `player` y pasos que defienden sus piezas de las capturas del rival.
+
+    Una defensa es un paso simple que termina junto a una trampa donde el rival
+    puede capturar: añade apoyo o saca de la trampa a la pieza amenazada.
+    """
+    color = COLORS[player]
+    moves = generate_capture_moves(position, color)
+    threatened = 0
+    for _, traps in _capture_moves(position, 1 - color):
+        for trap in traps:
+            threatened |= NEIGHBOR_MASKS[trap]
+    if threatened:
+        squares = position.squares
+        targets = threatened & ~(position.occupied[BLACK] | position.occupied[WHITE])
+        for sq in iter_bits(position.occupied[color] & ~position.frozen):
+            for target in STEP_NEIGHBORS[color][squares[sq] % 6 == RABBIT][sq]:
+                if targets >> target & 1:
+                    moves.append(encode_step(sq, target))
+    return moves
+
+
+def quiesce(position, is_maximizing_player, alpha, beta, budget=None, depth=QUIESCENCE_DEPTH, limit=None,
+            static=None):
+    """Evaluación de una hoja resolviendo antes las capturas en trampas.
+
+    El jugador puede quedarse con la evaluación estática (`static` si ya se
+    calculó por lotes) o seguir con capturas y defensas alternando pasos como
+    minimax, hasta `depth` pasos y QUIESCENCE_NODE_LIMIT nodos por hoja del horizonte.
+    """
+    if budget is not None:
+        budget.tick()
+    stats = search_stats
+    if limit is None:
+        limit = stats.quiescence_nodes + QUIESCENCE_NODE_LIMIT
+    stats.leaf_evals += 1
+    best = evaluate_board(position) if static is None else static
+    if depth == 0 or stats.quiescence_nodes >= limit:
+        return best
+    if is_maximizing_player:
+        if best >= beta:
+            return best
+        alpha = max(alpha, best)
+    else:
+        if best <= alpha:
+            return best
+        beta = min(beta, best)
+
+    for move in generate_quiescence_moves(position, "black" if is_maximizing_player else "white"):
+        if stats.quiescence_nodes >= limit:
+            break
+        stats.quiescence_nodes += 1
+        undo = position.make_step(move)
+        value = quiesce(position, not is_maximizing_player, alpha, beta, budget, depth - 1, limit)
+        position.unmake_step(undo)
+        if is_maximizing_player:
+            best = max(best, value)
+            alpha = max(alpha, value)
+        else:
+            best = min(best, value)
+            beta = min(beta, value)
+        if beta <= alpha:
+            stats.cutoffs += 1
+            break
+    return best
+
+
+def _search_root(position, player, root_turns, child_search, depth, budget):
+    """Busca los turnos raíz en orden con una ventana alfa-beta compartida.
+
+    Devuelve (turno, valor, completa); si el presupuesto se agota, `completa` es
+    False y el turno es el mejor de los que se llegaron a evaluar.
+    """
+    is_maximizing = player == "black"
+    best_turn = None
+    best_value = float('-inf') if is_maximizing else float('inf')
+    alpha, beta = float('-inf'), float('inf')
+    try:
+        for turn in root_turns:
+            undos = [position.make_step(move) for move in turn]
+            value = child_search(position, depth - 1, not is_maximizing, alpha, beta, budget)
+            for undo in reversed(undos):
+                position.unmake_step(undo)
+            if is_maximizing and (value > best_value or best_turn is None):
+                best_turn, best_value = turn, value
+                alpha = max(alpha, value)
+            elif not is_maximizing and (value < best_value or best_turn is None):
+                best_turn, best_value = turn, value
+                beta = min(beta, value)
+    except SearchAborted:
+        return best_turn, best_value, False
+    return best_turn, best_value, True
+
 
+def _iterative_deepening(position, player, root_turns, child_search, max_depth, budget, searcher=None):
+    """Profundización iterativa común a la búsqueda por pasos y por turnos.
+
+    `root_turns` son secuencias de movimientos y `child_search` es minimax o
+    turn_minimax. Cada iteración empieza por el mejor turno de la anterior y, si
+    hay `searcher` (arimaa_parallel.ParallelSearcher), reparte la raíz entre sus
+    procesos. Si el presupuesto se agota se devuelve la última iteración completa
+    (o, si ni la primera terminó, lo mejor que se llegó a evaluar). La posición es
+    una copia privada: al abortar no hace falta deshacer los pasos pendientes.
+    Devuelve (turno, valor, profundidad completada).
+    """
+    best_turn, best_value, completed_depth = None, None, 0
+    for depth in range(1, max_depth + 1):
+        if searcher is not None:
+            result = searcher.search_root(position, player, root_turns, child_search, depth, budget)
+        else:
+            result = _search_root(position, player, root_turns, child_search, depth, budget)
+        iteration_turn, iteration_value, complete = result
+        search_stats.record_depth(depth, budget.nodes, iteration_value, complete)
+        if not complete:
+            if best_turn is None:
+                best_turn, best_value = iteration_turn, iteration_value
+            break
+        if iteration_turn is None:
+            break
+        best_turn, best_value, completed_depth = iteration_turn, iteration_value, depth
+        root_turns.remove(best_turn)
+        root_turns.insert(0, best_turn)
+    return best_turn, best_value, completed_depth
+
+
+def _begin_search():
+    """Nuevo objeto de estadísticas para la búsqueda que empieza."""
+    global search_stats
+    search_stats = SearchStats()
+    search_stats.begin(transposition_table)
+    return search_stats
+
+
+def principal_variation(position, player, best, max_length, turns=False):
+    """Sigue las jugadas guardadas en la tabla desde `best`; devuelve la lista de jugadas como tuplas.
+
+    Con `turns` cada jugada es un turno completo (búsqueda por turnos). Se para al
+    faltar una entrada o si la jugada guardada no es legal (colisión de claves).
+    """
+    position = position.copy()
+    pv = []
+    move = best
+    while move is not None and len(pv) < max_length:
+        if not _play_if_legal(position, player, move if turns else (move,)):
+            return pv
+        pv.append(tuple(decode_turn(move)) if turns else decode_move(move))
+        player = "white" if player == "black" else "black"
+        key = search_key(position, player == "black")
+        entry = transposition_table.probe(key ^ ZOBRIST_TURN if turns else key)
+        move = entry[4] if entry is not None else None
+    return pv
+
+
+def _play_if_legal(position, player, moves):
+    """Aplica `moves` (enteros o tuplas) mientras sean legales; devuelve False si alguno no lo es."""
+    buffer = new_move_buffer()
     for move in moves:
-        new_board = apply_move(board, move)
-        move_value = minimax(new_board, 2, player == "white")
-        print(move, move_value)
-        if (player == "black" and move_value >= best_value) or (player == "white" and move_value <= best_value):
-            best_value = move_value
-            best_move = move
-    return best_move
+        if move.__class__ is not int:
+            move = encode_move(move)
+        count = generate_move_codes(position, player, buffer, selective=False)
+        if move not in buffer[:count]:
+            return False
+        position.make_step(move)
+    return True
+
+
+def _finish_search(stats, position, player, best, value, depth, budget, turns, profiler):
+    """Completa `stats`; `best` llega en enteros y se guarda como tuplas."""
+    if best is not None:
+        stats.best = tuple(decode_turn(best)) if turns else decode_move(best)
+    stats.value, stats.depth = value, depth
+    stats.finish(transposition_table, budget)
+    if profiler is not None:
+        stats.profile = dict(profiler.times)
+    if best is not None:
+        stats.pv = principal_variation(position, player, best, max(depth, 1), turns)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s", stats.report())
+        logger.debug("%s", transposition_table.report())
+
+
+def find_best_move(board, player, time_limit=None, node_limit=None, max_depth=None, searcher=None,
+                   return_stats=False, profile=False, budget=None, steps_left=MAX_STEPS, cache=None):
+    """Busca el mejor movimiento; `board` puede ser una Position o el tablero de ArimaaGame.
+
+    Sin límites busca a SEARCH_DEPTH pasos. Con `time_limit` (segundos) y/o
+    `node_limit` profundiza hasta agotar el presupuesto. Con `searcher` la raíz
+    se reparte entre procesos. Con `return_stats` devuelve (movimiento, SearchStats);
+    `profile` añade a las estadísticas el tiempo por sección (SearchProfiler; solo una
+    búsqueda perfilada a la vez por proceso, si no RuntimeError).
+    Un `budget` propio sustituye a los límites y permite detener la búsqueda
+    desde otro hilo con budget.stop(). Si `player` llega a la meta con los
+    `steps_left` pasos que le quedan se devuelve el primer movimiento sin buscar.
+    Con `cache` (AnalysisCache) se devuelve el análisis guardado si llega a la
+    profundidad pedida (`max_depth` o SEARCH_DEPTH) y se guarda el de la búsqueda.
+    """
+    # La búsqueda trabaja con make_step/unmake_step sobre su propia copia (al abortar
+    # queda a medias); `position` se conserva intacta para la variante principal
+    position = board.copy() if isinstance(board, Position) else Position.from_board(board)
+    if budget is None:
+        budget = SearchBudget(time_limit, node_limit)
+    stats = _begin_search()
+    # La caché solo guarda turnos enteros: con menos pasos cambia la comprobación de meta
+    if cache is not None and steps_left != MAX_STEPS:
+        cache = None
+    if cache is not None:
+        entry = cache.get(position, player)
+        required = max_depth if max_depth is not None else SEARCH_DEPTH
+        if (entry is not None and entry.depth >= required
+                and _play_if_legal(position.copy(), player, (entry.move,))):
+            stats.cache_hit = True
+            _finish_search(stats, position, player, encode_move(entry.move), entry.score, entry.depth,
+                           budget, False, None)
+            return (entry.move, stats) if return_stats else entry.move
+    profiler = SearchProfiler() if profile else None
+    if profiler is not None:
+        with profiler:
+            best, value, depth = _find_best_move(position.copy(), player, budget, max_depth, searcher,
+                                                 steps_left)
+    else:
+        best, value, depth = _find_best_move(position.copy(), player, budget, max_depth, searcher, steps_left)
+    _finish_search(stats, position, player, best, value, depth, budget, False, profiler)
+    if cache is not None and best is not None and depth:
+        cache.put(position, player, depth, value, best)
+    if best is not None:
+        best = decode_move(best)
+    return (best, stats) if return_stats else best
+
+
+def _find_best_move(position, player, budget, max_depth, searcher, steps_left=MAX_STEPS):
+    """Devuelve (movimiento entero, valor, profundidad completada)."""
+    win = _check_goals(position, player, steps_left)
+    if win is not None:
+        return win[0], _win_value(player), 0
+    if max_depth is None:
+        max_depth = SEARCH_DEPTH if budget.unlimited else MAX_ITERATIVE_DEPTH
+    table = transposition_table
+    table.new_search()
+    move_orderer.new_search()
+    key = search_key(position, player == "black")
+    buffer = new_move_buffer()
+    count = generate_move_codes(position, player, buffer)
+    entry = table.probe(key)
+    moves = move_orderer.order(position, buffer[:count], entry[4] if entry is not None else None)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Movimientos raíz: %s", decode_turn(moves))
+
+    root_turns = [(move,) for move in moves]
+    best_turn, best_value, depth = _iterative_deepening(
+        position, player, root_turns, minimax, max_depth, budget, searcher)
+    if best_turn is None:
+        # Ni una sola jugada evaluada: se juega la primera según el orden
+        return (moves[0] if moves else None), None, 0
+    if depth:
+        table.store(key, depth, EXACT, best_value, best_turn[0])
+    return best_turn[0], best_value, depth
+
+
+def _win_value(player):
+    return WIN_VALUE if player == "black" else -WIN_VALUE
+
+
+def terminal_value(position, mover):
+    """±WIN_VALUE (desde Black) si la partida termina tras el turno de `mover` (BLACK o WHITE), o None."""
+    result = position.outcome(mover)
+    if result is None:
+        return None
+    return _win_value(result.winner)
+
+
+def _check_goals(position, player, steps_left):
+    """Comprobación previa a la búsqueda: la meta de `player` si la tiene en `steps_left` pasos.
+
+    Si no, anota en search_stats si el rival amenaza meta en su próximo turno.
+    """
+    color = COLORS[player]
+    # Una tupla vacía es un conejo que ya estaba en la meta: no hay jugada que devolver
+    win = goal_in(position, color, steps_left) or None
+    if win is None:
+        search_stats.goal_threat = goal_in(position, 1 - color, MAX_STEPS) is not None
+    return win
+
+
+def _root_turns(position, player, steps_left, budget):
+    """(turnos, perdida): los turnos raíz sin los que dejan al rival llegar a la meta.
+
+    Si todos pierden se devuelven todos con perdida=True. La comprobación se hace
+    sobre la posición que entrega iter_turns, sin volver a aplicar cada turno; el
+    número de descartados queda en search_stats.pruned. Cada comprobación cuenta
+    como un nodo de `budget`. Si el presupuesto se agota (o se pide parar) se deja
+    de generar y se devuelven los turnos que ya había, al menos uno.
+    """
+    opponent = 1 - COLORS[player]
+    distance = goal_distance(position, opponent)
+    # Un turno propio acerca un conejo rival como mucho dos filas (dos empujes)
+    check_goals = distance is not None and distance <= MAX_STEPS + 2
+    safe, unchecked, losing = [], [], []
+    turns = iter_turns(position, player, steps_left)
+    for turn in turns:
+        if check_goals and not budget.stopped:
+            try:
+                budget.tick()
+            except SearchAborted:
+                pass
+        # En el medio juego generar todos los turnos puede costar más de un segundo y
+        # cada comprobación de meta milisegundos: el reloj se mira en cada turno
+        if budget.stopped or budget.out_of_time():
+            if not safe and not unchecked:
+                unchecked.append(turn)
+            break
+        if not check_goals:
+            unchecked.append(turn)
+        elif goal_in(position, opponent, MAX_STEPS) is None:
+            safe.append(turn)
+        else:
+            losing.append(turn)
+    # Cerrar el generador deshace los pasos del turno en curso
+    turns.close()
+    if not safe and not unchecked:
+        return losing, bool(losing)
+    search_stats.pruned = len(losing)
+    return safe + unchecked, False
+
+
+def iter_turns(position, player, steps_left=MAX_STEPS, selective=True, ply=None):
+    """Genera los turnos completos (1 a `steps_left` pasos) que llevan a posiciones distintas.
+
+    Cada turno es una tupla de enteros de arimaa_moves y se entrega con la posición
+    ya en su estado final; al reanudar el generador se deshace. Los órdenes de
+    pasos que repiten una posición final se descartan por su clave Zobrist, y un
+    turno nunca puede dejar la posición igual. Con `ply` se usan los búferes
+    compartidos de la búsqueda desde ese ply (hasta ply + steps_left - 1); sin él,
+    unos propios.
+    """
+    seen = {position.key: steps_left}
+    if ply is None:
+        buffers, ply = MoveBuffers(), 0
+    else:
+        buffers = move_buffers
+    return _iter_turns(position, player, steps_left, (), seen, selective, buffers, ply)
+
+
+def _iter_turns(position, player, steps_left, path, seen, selective, buffers, ply):
+    buffer = buffers[ply]
+    count = generate_move_codes(position, player, buffer, selective)
+    for index in range(count):
+        move = buffer[index]
+        cost = 2 if move & TYPE_MASK else 1
+        if cost > steps_left:
+            continue
+        undo = position.make_step(move)
+        try:
+            remaining = steps_left - cost
+            previous = seen.get(position.key)
+            # Solo se expande si no se llegó antes a esta posición con al menos los mismos pasos
+            if previous is None or previous < remaining:
+                seen[position.key] = remaining
+                turn = path + (move,)
+                if previous is None:
+                    yield turn
+                if remaining:
+                    yield from _iter_turns(position, player, remaining, turn, seen, selective, buffers,
+                                           ply + 1)
+        finally:
+            position.unmake_step(undo)
+
+
+def generate_turns(position, player, steps_left=MAX_STEPS, selective=True):
+    """Lista de turnos únicos (tuplas de enteros) para `player`."""
+    return list(iter_turns(position, player, steps_left, selective))
+
+
+def turn_minimax(position, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf'), budget=None,
+                 ply=0):
+    """Alfa-beta cuya unidad es un turno completo de cada jugador; cada turno ocupa MAX_STEPS plies."""
+    if budget is not None:
+        budget.tick()
+    # Fin de partida tras el turno del rival: metas, conejos y movilidad salen de la posición
+    value = terminal_value(position, WHITE if is_maximizing_player else BLACK)
+    if value is not None:
+        return value
+    # Quien mueve y llega a la meta gana. Las hojas no se comprueban: las del
+    # primer turno ya las filtró _root_turns
+    if depth and goal_in(position, BLACK if is_maximizing_player else WHITE) is not None:
+        return WIN_VALUE if is_maximizing_player else -WIN_VALUE
+    if depth == 0:
+        search_stats.leaf_evals += 1
+        return evaluate_board(position)
+
+    table = transposition_table
+    key = search_key(position, is_maximizing_player) ^ ZOBRIST_TURN
+    entry = table.probe(key)
+    if entry is not None and (entry[1] == depth or (entry[1] > depth and not table.exact_depth_only)):
+        flag, score = entry[2], entry[3]
+        if flag == EXACT:
+            return score
+        if flag == LOWER:
+            alpha = max(alpha, score)
+        else:
+            beta = min(beta, score)
+        if beta <= alpha:
+            return score
+
+    alpha_orig, beta_orig = alpha, beta
+    best_turn = None
+    best_value = float('-inf') if is_maximizing_player else float('inf')
+    turns = iter_turns(position, "black" if is_maximizing_player else "white", ply=ply)
+    try:
+        for turn in turns:
+            value = turn_minimax(position, depth - 1, not is_maximizing_player, alpha, beta, budget,
+                                 ply + MAX_STEPS)
+            if is_maximizing_player:
+                if value > best_value or best_turn is None:
+                    best_value, best_turn = value, turn
+                alpha = max(alpha, value)
+            else:
+                if value < best_value or best_turn is None:
+                    best_value, best_turn = value, turn
+                beta = min(beta, value)
+            if beta <= alpha:
+                search_stats.cutoffs += 1
+                break
+    finally:
+        turns.close()
+
+    if best_value >= beta_orig:
+        flag = LOWER
+    elif best_value <= alpha_orig:
+        flag = UPPER
+    else:
+        flag = EXACT
+    table.store(key, depth, flag, best_value, best_turn)
+    return best_value
+
+
+def find_best_turn(board, player, steps_left=MAX_STEPS, depth=None, time_limit=None, node_limit=None,
+                   searcher=None, return_stats=False, profile=False, budget=None):
+    """Busca el mejor turno completo; devuelve la lista de movimientos (tuplas) a jugar, o [] si no hay.
+
+    Sin límites busca a TURN_SEARCH_DEPTH turnos; con `time_limit` y/o
+    `node_limit` profundiza hasta agotar el presupuesto. Con `searcher` los turnos
+    raíz se reparten entre procesos. `return_stats`, `profile` y `budget` como en
+    find_best_move. Si la tabla ya tiene el valor exacto de la raíz a la profundidad
+    pedida (p. ej. tras pensar en el turno del rival) se juega sin volver a buscar.
+    Antes de buscar se juega una meta inmediata y se descartan los turnos que
+    dejan al rival llegar a la meta (search_stats.goal_threat/pruned).
+    """
+    position = board.copy() if isinstance(board, Position) else Position.from_board(board)
+    if budget is None:
+        budget = SearchBudget(time_limit, node_limit)
+    stats = _begin_search()
+    profiler = SearchProfiler() if profile else None
+    if profiler is not None:
+        with profiler:
+            best, value, completed = _find_best_turn(position.copy(), player, steps_left, depth, budget,
+                                                     searcher)
+    else:
+        best, value, completed = _find_best_turn(position.copy(), player, steps_left, depth, budget,
+                                                 searcher)
+    _finish_search(stats, position, player, tuple(best) if best else None, value, completed, budget,
+                   True, profiler)
+    best = decode_turn(best)
+    return (best, stats) if return_stats else best
+
+
+def _find_best_turn(position, player, steps_left, depth, budget, searcher):
+    """Devuelve (lista de movimientos enteros, valor, profundidad completada)."""
+    if depth is None:
+        depth = TURN_SEARCH_DEPTH if budget.unlimited else MAX_ITERATIVE_DEPTH
+    table = transposition_table
+    table.new_search()
+    key = search_key(position, player == "black") ^ ZOBRIST_TURN
+
+    win = _check_goals(position, player, steps_left)
+    if win is not None:
+        return list(win), _win_value(player), 0
+
+    entry = table.probe(key)
+    # Valor exacto ya calculado (p. ej. al pensar en el turno del rival): no hace falta buscar.
+    # Esas entradas salen de hojas sin filtrar metas, así que el turno guardado pasa el
+    # mismo filtro que _root_turns
+    if entry is not None and entry[2] == EXACT and entry[1] >= depth and steps_left == MAX_STEPS:
+        after = position.copy()
+        if (_play_if_legal(after, player, entry[4])
+                and goal_in(after, 1 - COLORS[player], MAX_STEPS) is None):
+            return list(entry[4]), entry[3], entry[1]
+
+    root_turns, lost = _root_turns(position, player, steps_left, budget)
+    if lost:
+        # Cualquier turno deja la meta al rival: no hay nada que buscar
+        return list(root_turns[0]), -_win_value(player), 0
+    if entry is not None and entry[4] in root_turns:
+        root_turns.remove(entry[4])
+        root_turns.insert(0, entry[4])
+
+    best_turn, best_value, completed = _iterative_deepening(
+        position, player, root_turns, turn_minimax, depth, budget, searcher)
+    if best_turn is None:
+        return (list(root_turns[0]) if root_turns else []), None, 0
+    if completed:
+        table.store(key, completed, EXACT, best_value, best_turn)
+    return list(best_turn), best_value, completed
+
+
+def _check_ponder_goal():
+    """Tras pensar en el turno del rival, el turno guardado en la tabla no puede dejarle la meta.
+
+    White piensa a dos turnos, juega a5-a4 y Black busca: la entrada exacta que
+    dejó la primera búsqueda (hojas sin filtrar metas) no debe jugarse si el
+    conejo de a4 llega a la meta en el turno siguiente.
+    """
+    from arimaa_bitboard import position_from_fen
+
+    position, _ = position_from_fen("7R/3D4/6cE/8/8/r7/8/7h w")
+    transposition_table.clear()
+    find_best_turn(position, "white", depth=2)
+    position.make_step(encode_move(((5, 0), (4, 0))))
+    turn = find_best_turn(position, "black")
+    return _play_if_legal(position, "black", turn) and goal_in(position, WHITE, MAX_STEPS) is None
+
+
+if __name__ == "__main__":
+    ok = _check_ponder_goal()
+    print("meta del rival tras pensar en su turno: " + ("ok" if ok else "FALLO"))
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,135 @@
+# arimaa_analyze.py - Análisis por lotes de posiciones desde la línea de comandos
+#
+# Uso: python arimaa_analyze.py [ARCHIVO] [--workers N] [--time SEGUNDOS] [--depth N] [--nodes N]
+# Lee una posición por línea (FEN de position_from_fen, con el jugador al turno)
+# de un archivo o de la entrada estándar. También acepta líneas JSON con "fen" y un
+# "id" opcional, que se copia en la salida. Las líneas vacías o que empiezan por
+# "#" se ignoran.
+#
+# Las posiciones se reparten entre procesos y cada una busca el mejor turno con
+# su propio presupuesto. Cada resultado se escribe como una línea JSON en cuanto
+# termina, en orden de llegada; "index" es el número de línea de la entrada. Nunca
+# hay más de `max_pending` posiciones leídas sin escribir, así que la memoria no
+# crece con el tamaño de la entrada.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+DEFAULT_TIME_LIMIT = 1.0  # Segundos por posición
+PENDING_PER_WORKER = 2  # Posiciones en vuelo por proceso: una buscando y otra esperando
+
+
+def read_positions(lines):
+    """Genera (índice, fen, id) por cada posición de `lines`; el índice es el número de línea."""
+    for index, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except ValueError:
+                yield index, line, None
+                continue
+            yield index, data.get("fen", ""), data.get("id")
+        else:
+            yield index, line, None
+
+
+def analyze_position(task):
+    """Busca el mejor turno de una posición; devuelve el diccionario de la línea de salida.
+
+    Cualquier excepción queda en el campo "error" en lugar de propagarse.
+    """
+    from arimaa_ai import find_best_turn
+    from arimaa_bitboard import position_from_fen
+    from arimaa_notation import turn_to_notation
+
+    index, fen, position_id, time_limit, depth, node_limit = task
+    result = {"index": index, "fen": fen}
+    if position_id is not None:
+        result["id"] = position_id
+    start = time.perf_counter()
+    # Un error en una posición va a su línea de salida: el resto del lote sigue
+    try:
+        position, player = position_from_fen(fen)
+        turn, stats = find_best_turn(position, player, depth=depth, time_limit=time_limit or None,
+                                     node_limit=node_limit, return_stats=True)
+        best = turn_to_notation(position, turn) if turn else None
+    except ValueError as e:
+        result["error"] = str(e) or "FEN inválido."
+        return result
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result.update({
+        "player": player,
+        "best": best,
+        "value": stats.value,
+        "depth": stats.depth,
+        "nodes": stats.nodes,
+        "elapsed": round(time.perf_counter() - start, 4),
+    })
+    return result
+
+
+def analyze(lines, output, workers=None, time_limit=DEFAULT_TIME_LIMIT, depth=None, node_limit=None,
+            max_pending=None):
+    """Analiza las posiciones de `lines` en paralelo y escribe una línea JSON por resultado.
+
+    Devuelve (posiciones analizadas, errores).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * PENDING_PER_WORKER
+    count = errors = 0
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        positions = read_positions(lines)
+        exhausted = False
+        while pending or not exhausted:
+            # Se lee de la entrada solo lo necesario para mantener la ventana llena
+            while not exhausted and len(pending) < max_pending:
+                item = next(positions, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(analyze_position, item + (time_limit, depth, node_limit)))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                errors += "error" in result
+                count += 1
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    return count, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis por lotes de posiciones con salida JSONL.")
+    parser.add_argument("input", nargs="?", help="archivo de posiciones (por defecto, la entrada estándar)")
+    parser.add_argument("--workers", type=int, help="procesos (por defecto, uno por CPU)")
+    parser.add_argument("--time", type=float, default=DEFAULT_TIME_LIMIT, help="segundos por posición (0: sin límite de tiempo)")
+    parser.add_argument("--depth", type=int, help="profundidad máxima en turnos")
+    parser.add_argument("--nodes", type=int, help="límite de nodos por posición")
+    parser.add_argument("--max-pending", type=int, help="posiciones en vuelo como máximo")
+    args = parser.parse_args()
+
+    lines = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    started = time.perf_counter()
+    try:
+        count, errors = analyze(lines, sys.stdout, args.workers, args.time, args.depth, args.nodes,
+                                args.max_pending)
+    except BrokenPipeError:
+        # La salida se cerró antes de tiempo (p. ej. "| head"): se termina sin traza
+        sys.stdout = open(os.devnull, "w")
+        sys.exit(1)
+    finally:
+        if args.input:
+            lines.close()
+    print(f"{count} posiciones, {errors} errores, {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    sys.exit(1 if errors else 0)
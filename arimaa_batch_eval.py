@@ -0,0 +1,202 @@
+# arimaa_batch_eval.py - Evaluación por lotes con NumPy
+#
+# evaluate_board puntúa una posición cada vez. Aquí un lote de posiciones es un
+# array (N, 12) de bitboards uint64 (uno por tipo de pieza), que se despliega en
+# planos (N, 12, 64) para la tabla pieza-casilla; congelación y movilidad se
+# calculan con desplazamientos sobre los uint64 de todo el lote a la vez. Los
+# resultados coinciden exactamente con evaluate_board.
+#
+# minimax lo usa en los nodos de profundidad 1: los hijos se obtienen aplicando
+# todos los movimientos al tablero padre en forma vectorial (capturas incluidas),
+# sin make_step, y su evaluación estática se pasa a la quiescencia.
+#
+# NumPy es opcional: sin él HAVE_NUMPY es False y la búsqueda evalúa hoja a hoja.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from arimaa_bitboard import NOT_FILE_A, NOT_FILE_H
+import arimaa_eval
+from arimaa_moves import PUSH, STEP
+from arimaa_tables import NEIGHBOR_MASKS, TRAP_SQUARES
+
+HAVE_NUMPY = np is not None
+BATCH_MIN_MOVES = 24  # Con menos hermanos el coste fijo de NumPy no compensa
+
+if HAVE_NUMPY:
+    _U64 = np.uint64
+    _ZERO = _U64(0)
+    _ONE = _U64(1)
+    _NOT_FILE_A = _U64(NOT_FILE_A)
+    _NOT_FILE_H = _U64(NOT_FILE_H)
+    _SHIFT_ROW = _U64(8)
+    _SHIFT_COL = _U64(1)
+    _SQUARE_BITS = _ONE << np.arange(64, dtype=np.uint64)
+    _TRAP_BITS = np.array([1 << trap for trap in TRAP_SQUARES], dtype=np.uint64)
+    _TRAP_GUARDS = np.array([NEIGHBOR_MASKS[trap] for trap in TRAP_SQUARES], dtype=np.uint64)
+    _popcount = getattr(np, "bitwise_count", None)
+
+
+def load_weights():
+    """Toma los pesos actuales de arimaa_eval (ver arimaa_ai.configure_evaluation)."""
+    global _PIECE_SQUARE, _MOBILITY_WEIGHT
+    # PIECE_SQUARE aplanado para multiplicar por los planos (N, 12 * 64)
+    _PIECE_SQUARE = np.array(arimaa_eval.PIECE_SQUARE, dtype=np.float64).reshape(12 * 64)
+    _MOBILITY_WEIGHT = arimaa_eval.MOBILITY_WEIGHT
+
+
+if HAVE_NUMPY:
+    load_weights()
+
+
+def _count_bits(bitboards):
+    """Popcount de un array uint64 (np.bitwise_count desde NumPy 2.0)."""
+    if _popcount is not None:
+        return _popcount(bitboards).astype(np.int64)
+    bits = np.unpackbits(np.ascontiguousarray(bitboards).view(np.uint8).reshape(bitboards.shape + (8,)), axis=-1)
+    return bits.sum(axis=-1, dtype=np.int64)
+
+
+def _neighbors(bb):
+    """Versión vectorial de arimaa_bitboard.neighbors (los uint64 descartan el desbordamiento)."""
+    return ((bb << _SHIFT_ROW) | (bb >> _SHIFT_ROW)
+            | ((bb << _SHIFT_COL) & _NOT_FILE_A) | ((bb >> _SHIFT_COL) & _NOT_FILE_H))
+
+
+def encode_positions(positions):
+    """Array (N, 12) uint64 con los bitboards de cada posición."""
+    return np.array([position.bitboards for position in positions], dtype=np.uint64).reshape(-1, 12)
+
+
+def to_planes(bitboards):
+    """Array (N, 12, 64) uint8: un plano de 64 casillas por tipo de pieza."""
+    bitboards = np.ascontiguousarray(bitboards, dtype=np.uint64)
+    bits = np.unpackbits(bitboards.view(np.uint8).reshape(-1, 12, 8), axis=2, bitorder="little")
+    return bits.reshape(-1, 12, 64)
+
+
+def _frozen(pieces, occupied):
+    """Versión vectorial de Position.compute_frozen_mask para los dos colores: array (N, 2).
+
+    `pieces` es el lote como (N, 2, 6): color y fuerza.
+    """
+    enemy = pieces[:, ::-1, :]
+    # stronger[:, c, s]: piezas rivales de fuerza mayor que s (OR acumulado desde el elefante)
+    stronger = np.bitwise_or.accumulate(enemy[:, :, :0:-1], axis=2)[:, :, ::-1]
+    frozen = np.bitwise_or.reduce(pieces[:, :, :5] & _neighbors(stronger), axis=2)
+    return frozen & ~_neighbors(occupied)
+
+
+def _step_counts(pieces, occupied):
+    """Versión vectorial de Position.step_count para los dos colores: array (N, 2)."""
+    empty = ~(occupied[:, :1] | occupied[:, 1:])
+    movers = occupied & ~_frozen(pieces, occupied)
+    others = movers & ~pieces[:, :, 0]
+    # Los conejos no retroceden: Black no baja de fila (>> 8) y White no sube (<< 8)
+    north = movers.copy()
+    north[:, 0] = others[:, 0]
+    south = movers.copy()
+    south[:, 1] = others[:, 1]
+    targets = np.stack((north >> _SHIFT_ROW, south << _SHIFT_ROW,
+                        (movers >> _SHIFT_COL) & _NOT_FILE_H, (movers << _SHIFT_COL) & _NOT_FILE_A), axis=2)
+    return _count_bits(targets & empty[:, :, None]).sum(axis=2)
+
+
+def evaluate_batch(bitboards):
+    """Evaluación de cada fila de un array (N, 12) de bitboards, igual que evaluate_board."""
+    bitboards = np.ascontiguousarray(bitboards, dtype=np.uint64).reshape(-1, 12)
+    # Las sumas de enteros pequeños son exactas en float64, como position.score
+    score = to_planes(bitboards).reshape(-1, 12 * 64) @ _PIECE_SQUARE
+    pieces = bitboards.reshape(-1, 2, 6)
+    occupied = np.bitwise_or.reduce(pieces, axis=2)
+    counts = _step_counts(pieces, occupied)
+    return score + (counts[:, 0] - counts[:, 1]) * _MOBILITY_WEIGHT
+
+
+def evaluate_positions(positions):
+    """Evaluación de una lista de Position en una sola llamada."""
+    return evaluate_batch(encode_positions(positions))
+
+
+def child_bitboards(position, moves):
+    """Array (N, 12) con los bitboards de `position` tras cada movimiento entero de `moves`.
+
+    Aplica pasos, empujes y jalones y retira las piezas que quedan sin apoyo en
+    una trampa. Basta con mirar las trampas al final del movimiento: en un
+    empuje o jalón la pieza rival no puede apoyar a las del que mueve ni al revés.
+    """
+    codes = np.asarray(moves, dtype=np.int64)
+    count = len(codes)
+    pieces = np.array([-1 if piece is None else piece for piece in position.squares], dtype=np.int64)
+    origin = codes & 0x3F
+    destination = codes >> 6 & 0x3F
+    affected = codes >> 12 & 0x3F
+    kind = codes >> 18 & 3
+    origin_bit = _SQUARE_BITS[origin]
+    destination_bit = _SQUARE_BITS[destination]
+    affected_bit = _SQUARE_BITS[affected]
+
+    children = np.repeat(np.array([position.bitboards], dtype=np.uint64), count, axis=0)
+    rows = np.arange(count)
+    # Al empujar, el que mueve ocupa la casilla de la pieza empujada
+    children[rows, pieces[origin]] ^= origin_bit | np.where(kind == PUSH, affected_bit, destination_bit)
+    double = kind != STEP
+    if double.any():
+        # La pieza rival va al destino (empuje) o a la casilla que deja el que jala (jalón)
+        landing = np.where(kind == PUSH, destination_bit, origin_bit)
+        children[rows[double], pieces[affected[double]]] ^= (affected_bit | landing)[double]
+
+    # Piezas de cada color en una trampa y sin aliados al lado: (N, 2, trampa)
+    pieces = children.reshape(-1, 2, 6)
+    occupied = np.bitwise_or.reduce(pieces, axis=2)[:, :, None]
+    captured = ((occupied & _TRAP_BITS) != _ZERO) & ((occupied & _TRAP_GUARDS) == _ZERO)
+    if captured.any():
+        pieces &= ~np.bitwise_or.reduce(np.where(captured, _TRAP_BITS, _ZERO), axis=2)[:, :, None]
+    return children
+
+
+def evaluate_children(position, moves):
+    """Evaluación estática de la posición tras cada movimiento de `moves`, en el mismo orden."""
+    return evaluate_batch(child_bitboards(position, moves)).tolist()
+
+
+def _check_corpus():
+    """Compara evaluate_batch y child_bitboards con la versión escalar en los hijos de las posiciones de perft."""
+    from arimaa_ai import evaluate_board, generate_moves
+    from arimaa_bitboard import position_from_fen
+    from arimaa_moves import encode_move
+    from arimaa_perft import PERFT_SUITE
+
+    checked = mismatches = 0
+    for fen in dict.fromkeys(case[1] for case in PERFT_SUITE):
+        root, _ = position_from_fen(fen)
+        for player in ("black", "white"):
+            for first in [None] + generate_moves(root, player):
+                parent = root.copy()
+                if first is not None:
+                    parent.make_step(first)
+                moves = [encode_move(move) for move in generate_moves(parent, player)]
+                if not moves:
+                    continue
+                expected = []
+                boards = []
+                for move in moves:
+                    undo = parent.make_step(move)
+                    expected.append(evaluate_board(parent))
+                    boards.append(parent.bitboards[:])
+                    parent.unmake_step(undo)
+                values = evaluate_children(parent, moves)
+                children = child_bitboards(parent, moves).tolist()
+                checked += len(moves)
+                mismatches += sum(a != b for a, b in zip(values, expected))
+                mismatches += sum(a != b for a, b in zip(children, boards))
+    return checked, mismatches
+
+
+if __name__ == "__main__":
+    if not HAVE_NUMPY:
+        raise SystemExit("NumPy no está instalado.")
+    checked, mismatches = _check_corpus()
+    print(f"{checked} hijos comparados, {mismatches} diferencias")
+    raise SystemExit(1 if mismatches else 0)
@@ -0,0 +1,515 @@
+# arimaa_bitboard.py - Representación del tablero con bitboards
+#
+# Casillas numeradas 0..63 como fila * 8 + columna (fila 0 = lado de Black).
+# Cada pieza tiene un índice color * 6 + fuerza, con color 0 = Black (mayúsculas)
+# y color 1 = White (minúsculas).
+
+import random
+
+from arimaa_eval import PIECE_SQUARE
+from arimaa_moves import PUSH, encode_move
+from arimaa_tables import (
+    NEIGHBORS, NEIGHBOR_MASKS, TRAP_SQUARES, TRAP_MASK, GUARDED_TRAP, TRAP_INDEX,
+)
+
+BLACK = 0
+WHITE = 1
+COLORS = {"black": BLACK, "white": WHITE}
+PLAYERS = ("black", "white")
+
+PIECE_CODES = "RCDHAErcdhae"
+PIECE_INDEX = {code: index for index, code in enumerate(PIECE_CODES)}
+RABBIT = 0
+ELEPHANT = 5
+
+FULL = (1 << 64) - 1
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+ROW_MASKS = tuple(0xFF << (8 * row) for row in range(8))
+GOAL_ROW_MASKS = (ROW_MASKS[7], ROW_MASKS[0])  # Black gana en la fila 7 y White en la 0
+
+CENTER_MASK = sum(1 << (row * 8 + col) for row in range(2, 6) for col in range(2, 6))
+
+# Claves Zobrist con semilla fija para que los hashes sean reproducibles entre procesos
+_zobrist_rng = random.Random(0x41524D4141)
+ZOBRIST = tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(64)) for _ in range(12))
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+ZOBRIST_TURN = _zobrist_rng.getrandbits(64)  # Distingue entradas de búsqueda por turnos
+
+# Destinos de paso por color y por si la pieza es conejo (los conejos no retroceden)
+STEP_NEIGHBORS = tuple(
+    (
+        NEIGHBORS,
+        tuple(
+            tuple(adj for adj in NEIGHBORS[sq]
+                  if not (color == BLACK and adj < sq - 1) and not (color == WHITE and adj > sq + 1))
+            for sq in range(64)
+        ),
+    )
+    for color in (BLACK, WHITE)
+)
+
+
+def square(position):
+    """Convierte una coordenada (fila, columna) en índice de casilla."""
+    return position[0] * 8 + position[1]
+
+
+def neighbors(bb):
+    """Devuelve la máscara de casillas adyacentes a las de `bb`."""
+    return ((bb << 8) | (bb >> 8) | ((bb << 1) & NOT_FILE_A) | ((bb >> 1) & NOT_FILE_H)) & FULL
+
+
+def iter_bits(bb):
+    """Itera los índices de los bits activos de menor a mayor."""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class GameResult:
+    """Final de partida: `winner` ("black" o "white") y `reason` ("goal", "elimination" o "immobilization")."""
+
+    __slots__ = ("winner", "reason")
+
+    REASON_TEXT = {
+        "goal": "conejo en la meta",
+        "elimination": "{loser} sin conejos",
+        "immobilization": "{loser} inmovilizado",
+    }
+
+    def __init__(self, winner, reason):
+        self.winner = winner
+        self.reason = reason
+
+    @property
+    def loser(self):
+        return "white" if self.winner == "black" else "black"
+
+    def message(self):
+        reason = self.REASON_TEXT[self.reason].format(loser=self.loser.capitalize())
+        return f"¡{self.winner.capitalize()} gana! ({reason})"
+
+    def __eq__(self, other):
+        return isinstance(other, GameResult) and (self.winner, self.reason) == (other.winner, other.reason)
+
+    def __repr__(self):
+        return f"GameResult({self.winner!r}, {self.reason!r})"
+
+
+class Position:
+    """Posición de Arimaa: un bitboard por tipo de pieza y color más máscaras de ocupación.
+
+    `frozen` (piezas congeladas de ambos colores) y `trap_support` (aliados junto
+    a cada trampa, en trap_support[índice de trampa * 2 + color]) se actualizan en
+    put/remove/move solo para la casilla que cambia y sus vecinas. `rabbit_counts`
+    (conejos de cada color) cambia solo en put/remove; con ellos, los bitboards de
+    conejos y `frozen`, outcome() decide el final de partida sin recorrer el tablero.
+    """
+
+    __slots__ = ("bitboards", "occupied", "squares", "key", "score", "frozen", "trap_support", "rabbit_counts")
+
+    def __init__(self):
+        self.bitboards = [0] * 12
+        self.occupied = [0, 0]
+        self.squares = [None] * 64  # Índice de pieza por casilla, o None
+        self.key = 0  # Hash Zobrist, actualizado en cada put/remove/move
+        self.score = 0  # Suma de PIECE_SQUARE, actualizada igual que la clave
+        self.frozen = 0
+        self.trap_support = [0] * (2 * len(TRAP_SQUARES))
+        self.rabbit_counts = [0, 0]
+
+    @classmethod
+    def from_board(cls, board):
+        """Construye una posición a partir del formato de `ArimaaGame.board`."""
+        position = cls()
+        for row in range(8):
+            for col in range(8):
+                piece = board[row][col]
+                if piece:
+                    position.put(row * 8 + col, PIECE_INDEX[piece])
+        return position
+
+    def to_board(self):
+        """Devuelve la posición en el formato de lista de listas de `ArimaaGame.board`."""
+        board = [[None for _ in range(8)] for _ in range(8)]
+        for sq, piece in enumerate(self.squares):
+            if piece is not None:
+                board[sq >> 3][sq & 7] = PIECE_CODES[piece]
+        return board
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.bitboards = self.bitboards[:]
+        position.occupied = self.occupied[:]
+        position.squares = self.squares[:]
+        position.key = self.key
+        position.score = self.score
+        position.frozen = self.frozen
+        position.trap_support = self.trap_support[:]
+        position.rabbit_counts = self.rabbit_counts[:]
+        return position
+
+    def compute_key(self):
+        """Recalcula el hash Zobrist desde cero (para verificar el incremental)."""
+        key = 0
+        for sq, piece in enumerate(self.squares):
+            if piece is not None:
+                key ^= ZOBRIST[piece][sq]
+        return key
+
+    def compute_score(self):
+        """Recalcula la suma pieza-casilla desde cero (para verificar la incremental)."""
+        return sum(PIECE_SQUARE[piece][sq] for sq, piece in enumerate(self.squares) if piece is not None)
+
+    def compute_frozen(self):
+        """Recalcula la máscara de congeladas desde cero (para verificar la incremental)."""
+        return self.compute_frozen_mask(BLACK) | self.compute_frozen_mask(WHITE)
+
+    def compute_trap_support(self):
+        """Recalcula el apoyo de las trampas desde cero (para verificar el incremental)."""
+        return [(NEIGHBOR_MASKS[trap] & self.occupied[color]).bit_count()
+                for trap in TRAP_SQUARES for color in (BLACK, WHITE)]
+
+    def compute_rabbit_counts(self):
+        """Recuenta los conejos de cada color (para verificar los contadores incrementales)."""
+        return [self.bitboards[color * 6 + RABBIT].bit_count() for color in (BLACK, WHITE)]
+
+    def step_count(self, color):
+        """Pasos simples disponibles para `color`, contados con desplazamientos y popcount."""
+        empty = FULL ^ (self.occupied[BLACK] | self.occupied[WHITE])
+        movers = self.occupied[color] & ~self.frozen_mask(color)
+        others = movers & ~self.bitboards[color * 6 + RABBIT]
+        # Los conejos no retroceden: Black no sube de fila y White no baja
+        north = (others if color == BLACK else movers) >> 8
+        south = ((movers if color == BLACK else others) << 8) & FULL
+        west = (movers >> 1) & NOT_FILE_H
+        east = (movers << 1) & NOT_FILE_A
+        return ((north & empty).bit_count() + (south & empty).bit_count()
+                + (west & empty).bit_count() + (east & empty).bit_count())
+
+    def piece_at(self, sq):
+        """Devuelve el código de la pieza en una casilla o None."""
+        piece = self.squares[sq]
+        return PIECE_CODES[piece] if piece is not None else None
+
+    def put(self, sq, piece, refresh=True):
+        bit = 1 << sq
+        self.squares[sq] = piece
+        self.bitboards[piece] |= bit
+        self.occupied[piece // 6] |= bit
+        self.key ^= ZOBRIST[piece][sq]
+        self.score += PIECE_SQUARE[piece][sq]
+        trap = GUARDED_TRAP[sq]
+        if trap >= 0:
+            self.trap_support[trap * 2 + piece // 6] += 1
+        if piece % 6 == RABBIT:
+            self.rabbit_counts[piece // 6] += 1
+        if refresh:
+            self._refresh_frozen(NEIGHBOR_MASKS[sq] | bit)
+
+    def remove(self, sq):
+        piece = self.squares[sq]
+        bit = 1 << sq
+        mask = FULL ^ bit
+        self.squares[sq] = None
+        self.bitboards[piece] &= mask
+        self.occupied[piece // 6] &= mask
+        self.key ^= ZOBRIST[piece][sq]
+        self.score -= PIECE_SQUARE[piece][sq]
+        trap = GUARDED_TRAP[sq]
+        if trap >= 0:
+            self.trap_support[trap * 2 + piece // 6] -= 1
+        if piece % 6 == RABBIT:
+            self.rabbit_counts[piece // 6] -= 1
+        self._refresh_frozen(NEIGHBOR_MASKS[sq] | bit)
+        return piece
+
+    def move(self, from_sq, to_sq, refresh=True):
+        """Mueve la pieza de `from_sq` a `to_sq` (debe estar vacía).
+
+        Con refresh=False no se toca `frozen` (unmake_step lo restaura entero).
+        """
+        piece = self.squares[from_sq]
+        color = piece // 6
+        change = (1 << from_sq) | (1 << to_sq)
+        self.squares[from_sq] = None
+        self.squares[to_sq] = piece
+        self.bitboards[piece] ^= change
+        self.occupied[color] ^= change
+        self.key ^= ZOBRIST[piece][from_sq] ^ ZOBRIST[piece][to_sq]
+        self.score += PIECE_SQUARE[piece][to_sq] - PIECE_SQUARE[piece][from_sq]
+        trap = GUARDED_TRAP[from_sq]
+        if trap >= 0:
+            self.trap_support[trap * 2 + color] -= 1
+        trap = GUARDED_TRAP[to_sq]
+        if trap >= 0:
+            self.trap_support[trap * 2 + color] += 1
+        if refresh:
+            self._refresh_frozen(NEIGHBOR_MASKS[from_sq] | NEIGHBOR_MASKS[to_sq] | change)
+
+    def _refresh_frozen(self, area):
+        """Recalcula `frozen` solo en las casillas de `area` (las que cambiaron y sus vecinas)."""
+        squares = self.squares
+        occupied = self.occupied
+        frozen = self.frozen & ~area
+        pieces = area & (occupied[BLACK] | occupied[WHITE])
+        while pieces:
+            low = pieces & -pieces
+            pieces ^= low
+            sq = low.bit_length() - 1
+            piece = squares[sq]
+            if NEIGHBOR_MASKS[sq] & occupied[piece // 6]:
+                continue
+            # Sin aliados al lado, toda vecina es enemiga: basta una más fuerte
+            strength = piece % 6
+            for adj in NEIGHBORS[sq]:
+                other = squares[adj]
+                if other is not None and other % 6 > strength:
+                    frozen |= low
+                    break
+        self.frozen = frozen
+
+    def push(self, pusher_sq, pushed_sq, new_sq):
+        """Empuja la pieza de `pushed_sq` a `new_sq` y el empujador ocupa su lugar."""
+        self.move(pushed_sq, new_sq)
+        self.move(pusher_sq, pushed_sq)
+
+    def pull(self, puller_sq, pulled_sq, new_sq):
+        """El jalador pasa a `new_sq` y la pieza jalada ocupa su lugar."""
+        self.move(puller_sq, new_sq)
+        self.move(pulled_sq, puller_sq)
+
+    def _step(self, from_sq, to_sq):
+        """Mueve una pieza y retira las piezas que quedan sin apoyo en una trampa.
+
+        Devuelve (origen, destino, capturas, congeladas antes del paso).
+        """
+        frozen = self.frozen
+        self.move(from_sq, to_sq)
+        captured = ()
+        # Solo pueden caer las trampas junto al origen o la propia casilla de destino
+        check = (NEIGHBOR_MASKS[from_sq] | (1 << to_sq)) & TRAP_MASK
+        if check:
+            squares = self.squares
+            support = self.trap_support
+            for trap in iter_bits(check):
+                piece = squares[trap]
+                if piece is not None and not support[TRAP_INDEX[trap] * 2 + piece // 6]:
+                    self.remove(trap)
+                    captured += ((trap, piece),)
+        return (from_sq, to_sq, captured, frozen)
+
+    def make_step(self, move):
+        """Aplica un paso, empuje o jalón en el sitio y devuelve el registro para deshacerlo.
+
+        `move` es un entero de arimaa_moves o, fuera de la búsqueda, una tupla.
+        """
+        if move.__class__ is not int:
+            move = encode_move(move)
+        origin = move & 0x3F
+        destination = move >> 6 & 0x3F
+        kind = move >> 18 & 3
+        if not kind:
+            return (self._step(origin, destination),)
+        affected = move >> 12 & 0x3F
+        if kind == PUSH:
+            return (self._step(affected, destination), self._step(origin, affected))
+        return (self._step(origin, destination), self._step(affected, origin))
+
+    def unmake_step(self, undo):
+        """Restaura exactamente la posición anterior a `make_step`."""
+        for from_sq, to_sq, captured, frozen in reversed(undo):
+            for trap, piece in captured:
+                self.put(trap, piece, False)
+            self.move(to_sq, from_sq, False)
+            self.frozen = frozen
+
+    def frozen_mask(self, color):
+        """Máscara de piezas de `color` congeladas (del mapa incremental `frozen`)."""
+        return self.frozen & self.occupied[color]
+
+    def compute_frozen_mask(self, color):
+        """Máscara de piezas de `color` congeladas: junto a un enemigo más fuerte y sin aliados."""
+        bitboards = self.bitboards
+        own_base = color * 6
+        enemy_base = (1 - color) * 6
+        frozen = 0
+        stronger = 0
+        for strength in range(4, -1, -1):
+            stronger |= bitboards[enemy_base + strength + 1]
+            own = bitboards[own_base + strength]
+            if own and stronger:
+                frozen |= own & neighbors(stronger)
+        return frozen & ~neighbors(self.occupied[color])
+
+    def can_move(self, color):
+        """True si `color` tiene algún paso, empuje o jalón.
+
+        Un jalón necesita una casilla vacía junto al jalador, que ya es un paso,
+        así que tras los pasos solo quedan por mirar los empujes.
+        """
+        occupied = self.occupied
+        empty = FULL ^ (occupied[BLACK] | occupied[WHITE])
+        near_empty = neighbors(empty)
+        movers = occupied[color] & ~self.frozen
+        rabbits = self.bitboards[color * 6 + RABBIT]
+        # Cualquier pieza libre que no sea conejo y toque una casilla vacía puede dar un paso
+        if movers & near_empty & ~rabbits:
+            return True
+        if movers & near_empty and self.step_count(color):
+            return True
+        # Rivales con una casilla vacía al lado, que son los únicos empujables
+        targets = occupied[1 - color] & near_empty
+        pushers = movers & ~rabbits & neighbors(targets)
+        squares = self.squares
+        for sq in iter_bits(pushers):
+            strength = squares[sq] % 6
+            for adj in NEIGHBORS[sq]:
+                if targets >> adj & 1 and squares[adj] % 6 < strength:
+                    return True
+        return False
+
+    def outcome(self, mover):
+        """GameResult si la partida termina al acabar el turno de `mover` (BLACK o WHITE), o None.
+
+        Sigue el orden del reglamento: meta de quien movió, meta del rival,
+        rival sin conejos, quien movió sin conejos y rival sin movimientos.
+        """
+        opponent = 1 - mover
+        bitboards = self.bitboards
+        if bitboards[mover * 6 + RABBIT] & GOAL_ROW_MASKS[mover]:
+            return GameResult(PLAYERS[mover], "goal")
+        if bitboards[opponent * 6 + RABBIT] & GOAL_ROW_MASKS[opponent]:
+            return GameResult(PLAYERS[opponent], "goal")
+        if not self.rabbit_counts[opponent]:
+            return GameResult(PLAYERS[mover], "elimination")
+        if not self.rabbit_counts[mover]:
+            return GameResult(PLAYERS[opponent], "elimination")
+        if not self.can_move(opponent):
+            return GameResult(PLAYERS[mover], "immobilization")
+        return None
+
+    def is_frozen(self, sq):
+        return bool(self.frozen >> sq & 1)
+
+    def has_support(self, sq):
+        """True si la pieza de `sq` tiene un aliado al lado."""
+        piece = self.squares[sq]
+        if piece is None:
+            return False
+        trap = TRAP_INDEX.get(sq)
+        if trap is not None:
+            return self.trap_support[trap * 2 + piece // 6] > 0
+        return bool(NEIGHBOR_MASKS[sq] & self.occupied[piece // 6])
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.squares == other.squares
+
+    def __repr__(self):
+        rows = ["".join(PIECE_CODES[p] if p is not None else "." for p in self.squares[r * 8:r * 8 + 8])
+                for r in range(8)]
+        return "Position(%s)" % "/".join(rows)
+
+
+def position_from_fen(text):
+    """Lee una posición en notación tipo FEN: filas 0..7 separadas por '/', dígitos
+    para casillas vacías y, opcionalmente, 'b' o 'w' para el jugador que mueve.
+    Rechaza piezas sin apoyo en una trampa. Devuelve (Position, jugador)."""
+    parts = text.split()
+    rows = parts[0].split("/")
+    if len(rows) != 8:
+        raise ValueError("FEN inválido: se esperaban 8 filas.")
+    position = Position()
+    for row, row_text in enumerate(rows):
+        col = 0
+        for char in row_text:
+            if char.isdigit():
+                col += int(char)
+            elif char == ".":
+                col += 1
+            elif char in PIECE_INDEX:
+                if col >= 8:
+                    raise ValueError(f"FEN inválido: la fila {row} tiene más de 8 casillas.")
+                position.put(row * 8 + col, PIECE_INDEX[char])
+                col += 1
+            else:
+                raise ValueError(f"FEN inválido: pieza desconocida {char!r}.")
+        if col != 8:
+            raise ValueError(f"FEN inválido: la fila {row} no tiene 8 casillas.")
+    # Una pieza sin apoyo en una trampa ya habría sido capturada: la posición es imposible
+    for trap in TRAP_SQUARES:
+        if position.squares[trap] is not None and not position.has_support(trap):
+            raise ValueError(f"FEN inválido: pieza sin apoyo en la trampa de la fila {trap >> 3}, "
+                             f"columna {trap & 7}.")
+    player = "white"
+    if len(parts) > 1:
+        if parts[1] not in ("b", "w"):
+            raise ValueError("FEN inválido: el jugador debe ser 'b' o 'w'.")
+        player = "black" if parts[1] == "b" else "white"
+    return position, player
+
+
+def position_to_fen(position, player):
+    """Escribe la posición en la notación que lee position_from_fen."""
+    rows = []
+    for row in range(8):
+        text, empty = "", 0
+        for piece in position.squares[row * 8:row * 8 + 8]:
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            text += PIECE_CODES[piece]
+        rows.append(text + (str(empty) if empty else ""))
+    return "/".join(rows) + (" b" if player == "black" else " w")
+
+
+def is_frozen(position, sq):
+    """Verifica si la pieza en la casilla `sq` está congelada."""
+    return position.is_frozen(sq)
+
+
+def push_piece(position, pusher_sq, pushed_sq, new_sq):
+    """Empuja una pieza enemiga a una nueva posición."""
+    pusher = position.squares[pusher_sq]
+    pushed = position.squares[pushed_sq]
+
+    if pusher is None or pushed is None:
+        raise ValueError("Empuje inválido: falta una pieza.")
+    if pusher % 6 <= pushed % 6:
+        raise ValueError("Empuje inválido: el empujador debe ser más fuerte que la pieza empujada.")
+    if position.squares[new_sq] is not None:
+        raise ValueError("Empuje inválido: la nueva posición debe estar vacía.")
+    if pushed_sq not in NEIGHBORS[pusher_sq]:
+        raise ValueError("Empuje inválido: el empujador no está adyacente a la pieza empujada.")
+    if new_sq not in NEIGHBORS[pushed_sq]:
+        raise ValueError("Empuje inválido: la nueva posición no está adyacente a la pieza empujada.")
+
+    position.push(pusher_sq, pushed_sq, new_sq)
+    return position
+
+
+def pull_piece(position, puller_sq, pulled_sq, new_sq):
+    """Jala una pieza enemiga hacia la posición anterior del jalador."""
+    puller = position.squares[puller_sq]
+    pulled = position.squares[pulled_sq]
+
+    if puller is None or pulled is None:
+        raise ValueError("Jalada inválida: falta una pieza.")
+    if puller % 6 <= pulled % 6:
+        raise ValueError("Jalada inválida: el jalador debe ser más fuerte que la pieza jalada.")
+    if position.squares[new_sq] is not None:
+        raise ValueError("Jalada inválida: la nueva posición debe estar vacía.")
+    if pulled_sq not in NEIGHBORS[puller_sq]:
+        raise ValueError("Jalada inválida: el jalador no está adyacente a la pieza jalada.")
+    if new_sq not in NEIGHBORS[puller_sq]:
+        raise ValueError("Jalada inválida: la nueva posición no está adyacente al jalador.")
+
+    position.pull(puller_sq, pulled_sq, new_sq)
+    return position
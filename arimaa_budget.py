@@ -0,0 +1,50 @@
+# arimaa_budget.py - Límites de tiempo y de nodos para la búsqueda
+import time
+
+
+class SearchAborted(Exception):
+    """Se lanza dentro de la búsqueda cuando se agota el presupuesto o se pide detenerla."""
+
+
+class SearchBudget:
+    """Presupuesto de una búsqueda: tiempo en segundos, número de nodos, ambos o ninguno."""
+
+    CHECK_INTERVAL = 256  # Nodos entre consultas al reloj
+
+    def __init__(self, time_limit=None, node_limit=None):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.start = time.perf_counter()
+        self.deadline = self.start + time_limit if time_limit is not None else None
+        self.nodes = 0
+        self.stopped = False
+
+    @property
+    def unlimited(self):
+        return self.time_limit is None and self.node_limit is None
+
+    def tick(self):
+        """Cuenta un nodo y aborta la búsqueda si el presupuesto se ha agotado."""
+        self.nodes += 1
+        if self.stopped:
+            raise SearchAborted
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            self.stopped = True
+            raise SearchAborted
+        if (self.deadline is not None and not self.nodes % self.CHECK_INTERVAL
+                and time.perf_counter() >= self.deadline):
+            self.stopped = True
+            raise SearchAborted
+
+    def out_of_time(self):
+        """Consulta el reloj ya (para trabajo caro entre nodos) y marca la parada si se acabó el tiempo."""
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+        return self.stopped
+
+    def stop(self):
+        """Pide detener la búsqueda en el próximo nodo (seguro desde otro hilo)."""
+        self.stopped = True
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
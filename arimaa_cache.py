@@ -0,0 +1,179 @@
+# arimaa_cache.py - Caché persistente de análisis en SQLite
+#
+# find_best_move(..., cache=AnalysisCache(ruta)) consulta aquí antes de buscar y
+# guarda después el resultado: profundidad, valor y mejor movimiento por clave
+# Zobrist y jugador que mueve. El fichero sobrevive a reinicios y lo comparten
+# varios procesos: en modo WAL los lectores no se bloquean entre sí ni con el
+# escritor. Cada proceso (y cada copia tras fork o pickle) abre su propia conexión.
+#
+# Al superar `max_entries` se borran las entradas usadas hace más tiempo (LRU).
+# Los aciertos no escriben en el fichero al momento: se apuntan en memoria y se
+# vuelcan juntos en una sola transacción (al llenarse el lote, antes de cada
+# escritura y al cerrar). El número de entradas lo mantienen unos disparadores
+# en la tabla analysis_count, así que comprobar el límite no recorre la tabla.
+import os
+import sqlite3
+import threading
+import time
+
+from arimaa_bitboard import COLORS
+from arimaa_moves import decode_move, encode_move
+
+DEFAULT_MAX_ENTRIES = 100000
+BUSY_TIMEOUT = 5.0  # Segundos de espera si otro proceso está escribiendo
+EVICT_FRACTION = 0.1  # Al desbordar se libera este margen para no podar en cada escritura
+TOUCH_BATCH = 256  # Aciertos pendientes de marcar como usados antes de volcarlos
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key INTEGER NOT NULL,
+    side INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score REAL NOT NULL,
+    move INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, side)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used);
+CREATE TABLE IF NOT EXISTS analysis_count (entries INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS analysis_insert AFTER INSERT ON analysis
+BEGIN UPDATE analysis_count SET entries = entries + 1; END;
+CREATE TRIGGER IF NOT EXISTS analysis_delete AFTER DELETE ON analysis
+BEGIN UPDATE analysis_count SET entries = entries - 1; END;
+"""
+# Ficheros nuevos o de versiones sin contador: se cuenta una vez, de forma atómica
+INIT_COUNT = ("INSERT INTO analysis_count SELECT count(*) FROM analysis "
+              "WHERE NOT EXISTS (SELECT 1 FROM analysis_count)")
+
+
+def _signed(key):
+    """Las claves Zobrist son de 64 bits sin signo; SQLite guarda enteros con signo."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class CacheEntry:
+    """Resultado guardado: profundidad completada, valor (desde Black) y movimiento como tupla."""
+
+    __slots__ = ("depth", "score", "move")
+
+    def __init__(self, depth, score, move):
+        self.depth = depth
+        self.score = score
+        self.move = move
+
+    def __repr__(self):
+        return f"CacheEntry({self.depth}, {self.score}, {self.move})"
+
+
+class AnalysisCache:
+    """Caché de análisis en un fichero SQLite, limitada a `max_entries` con desalojo LRU."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # La conexión se comparte entre hilos (SearchJob)
+        self._connection = None
+        self._pid = None
+        self._touched = {}  # (key, side) -> momento del último acierto aún sin volcar
+
+    def __getstate__(self):
+        # La conexión no viaja a otros procesos: cada uno abre la suya
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_entries"])
+
+    def _connect(self):
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            connection.execute(INIT_COUNT)
+            self._connection = connection
+            self._pid = os.getpid()
+            self._touched = {}
+        return self._connection
+
+    def get(self, position, player):
+        """CacheEntry de la posición con `player` al turno, o None. Marca la entrada como usada."""
+        key = (_signed(position.key), COLORS[player])
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT depth, score, move FROM analysis WHERE key = ? AND side = ?",
+                                     key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touched(connection)
+        self.hits += 1
+        depth, score, move = row
+        return CacheEntry(depth, score, decode_move(move))
+
+    def put(self, position, player, depth, score, move):
+        """Guarda el análisis; una entrada existente solo se reemplaza con igual o más profundidad."""
+        if move.__class__ is not int:
+            move = encode_move(move)
+        with self._lock:
+            connection = self._connect()
+            self._flush_touched(connection)
+            connection.execute(
+                "INSERT INTO analysis (key, side, depth, score, move, used) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key, side) DO UPDATE SET depth = excluded.depth, score = excluded.score, "
+                "move = excluded.move, used = excluded.used WHERE excluded.depth >= analysis.depth",
+                (_signed(position.key), COLORS[player], depth, score, move, time.time()))
+            self._evict(connection)
+
+    def _flush_touched(self, connection):
+        """Escribe en una transacción la hora de uso de los aciertos pendientes."""
+        if not self._touched:
+            return
+        touched = [(used,) + key for key, used in self._touched.items()]
+        self._touched = {}
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("UPDATE analysis SET used = ? WHERE key = ? AND side = ?", touched)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _evict(self, connection):
+        """Si la caché desborda, borra las entradas menos usadas hasta dejar un margen libre."""
+        count = self._entries(connection)
+        if count <= self.max_entries:
+            return
+        excess = count - self.max_entries + int(self.max_entries * EVICT_FRACTION)
+        connection.execute(
+            "DELETE FROM analysis WHERE (key, side) IN "
+            "(SELECT key, side FROM analysis ORDER BY used LIMIT ?)", (excess,))
+
+    def _entries(self, connection):
+        return connection.execute("SELECT entries FROM analysis_count").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._entries(self._connect())
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM analysis")
+            self._touched = {}
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._flush_touched(self._connection)
+                self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
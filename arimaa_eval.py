@@ -0,0 +1,49 @@
+# arimaa_eval.py - Pesos de la evaluación y tabla pieza-casilla incremental
+#
+# Todo se puntúa desde el punto de vista de Black (positivo = bueno para Black).
+# Los índices de pieza son los de arimaa_bitboard: color * 6 + fuerza.
+from arimaa_tables import TRAP_SQUARES, TRAP_GUARD_SQUARES
+
+MATERIAL_WEIGHT = 10         # Por punto de fuerza (E=5 ... C=1, R=0)
+RABBIT_ADVANCE_WEIGHT = 1    # Por fila avanzada hacia la meta
+RABBIT_VALUE = 8             # Los conejos no tienen fuerza, pero perderlos acerca la derrota
+TRAP_GUARD_WEIGHT = 2        # Por pieza propia junto a una trampa
+TRAP_OCCUPY_PENALTY = 4      # Por pieza propia sobre una trampa
+MOBILITY_WEIGHT = 0.2        # Por paso simple disponible
+
+# Filtro de empujes y jalones de la búsqueda selectiva (evaluar_push_pull)
+PUSH_PULL_TRAP_WEIGHT = 3      # Por cada trampa a la que se acerca la pieza rival
+PUSH_PULL_CENTER_WEIGHT = 3    # Por llevarla al centro
+PUSH_PULL_CAPTURE_WEIGHT = 3   # Por punto de fuerza si queda sin apoyo en una trampa
+PUSH_PULL_CAPTURE_BONUS = 50   # Fijo por dejarla sin apoyo en una trampa
+
+# Pesos que se pueden cambiar en ejecución con arimaa_ai.configure_evaluation
+WEIGHT_NAMES = (
+    "MATERIAL_WEIGHT", "RABBIT_ADVANCE_WEIGHT", "RABBIT_VALUE", "TRAP_GUARD_WEIGHT", "TRAP_OCCUPY_PENALTY",
+    "MOBILITY_WEIGHT", "PUSH_PULL_TRAP_WEIGHT", "PUSH_PULL_CENTER_WEIGHT", "PUSH_PULL_CAPTURE_WEIGHT",
+    "PUSH_PULL_CAPTURE_BONUS",
+)
+
+
+def _piece_square_value(piece, sq):
+    color = piece // 6
+    strength = piece % 6
+    row = sq >> 3
+    value = strength * MATERIAL_WEIGHT
+    if strength == 0:
+        # Black avanza hacia la fila 7, White hacia la fila 0
+        value += RABBIT_VALUE + RABBIT_ADVANCE_WEIGHT * (row if color == 0 else 7 - row)
+    if sq in TRAP_GUARD_SQUARES:
+        value += TRAP_GUARD_WEIGHT
+    if sq in TRAP_SQUARES:
+        value -= TRAP_OCCUPY_PENALTY
+    return value if color == 0 else -value
+
+
+def build_piece_square():
+    """Tabla pieza-casilla con los pesos actuales del módulo."""
+    return tuple(tuple(_piece_square_value(piece, sq) for sq in range(64)) for piece in range(12))
+
+
+# PIECE_SQUARE[pieza][casilla]: material, avance de conejos y seguridad en trampas
+PIECE_SQUARE = build_piece_square()
@@ -1,23 +1,62 @@
-from arimaa_ai import find_best_move
-from arimaa_utils import is_frozen, pull_piece, push_piece
-import pygame
+import logging
+
+from arimaa_ai import find_best_turn, TURN_SEARCH_DEPTH
+from arimaa_bitboard import COLORS, Position
+from arimaa_jobs import SearchJob
+from arimaa_parallel import DEFAULT_WORKERS, ParallelSearcher
+from arimaa_utils import pull_piece, push_piece
+from arimaa_tables import PIECE_STRENGTH, TRAP_POSITIONS
+
+logger = logging.getLogger(__name__)
+
+PONDER_TIME_LIMIT = 30.0  # Segundos como mucho pensando en el turno del rival
 
 class ArimaaGame:
+    """Reglas y turno de la IA sin dependencias gráficas; la GUI se entera por observadores."""
+
     def __init__(self, gui=None):
         self.board = self.initialize_board()
         self.current_player = "white"
         self.steps_taken = 0
+        self.result = None  # GameResult cuando la partida termina
+        self.history = []  # (jugador, movimientos como tuplas) de cada turno jugado
+        self.turn_moves = []  # Movimientos del turno en curso
+        self.recorder = None  # GameRecordWriter que recibe cada turno (start_recording)
         self.gui = gui  # Referencia a la GUI
-        self.piece_weights = {
-            "E": 5,  # Elefante
-            "A": 4,  # Camello
-            "H": 3,  # Caballo
-            "D": 2,  # Perro
-            "C": 1,  # Gato
-            "R": 0,  # Conejo
-            "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0
-        }
-        self.trap_positions = [(2, 2), (2, 5), (5, 2), (5, 5)]
+        # Funciones sin argumentos que se llaman tras cada paso de la IA
+        self.observers = []
+        if gui is not None:
+            self.add_observer(gui.render)
+        self.piece_weights = PIECE_STRENGTH  # Elefante 5, Camello 4, Caballo 3, Perro 2, Gato 1, Conejo 0
+        self.trap_positions = list(TRAP_POSITIONS)
+        # Presupuesto de la IA por turno (None = profundidad fija)
+        self.ai_time_limit = None  # Segundos
+        self.ai_node_limit = None
+        # Procesos para la búsqueda de la IA; el pool se crea una vez por partida
+        self.ai_workers = DEFAULT_WORKERS
+        self._searcher = None
+        self.ai_profile = False  # Medir tiempos de generación, evaluación y make/unmake
+        self.last_search_stats = None  # SearchStats de la última búsqueda de la IA
+        # Con ai_async la IA busca en un hilo y la GUI recoge el turno con poll_ai()
+        self.ai_async = False
+        # Pensar en el turno del rival mientras juega; la tabla de transposición conserva el trabajo
+        self.ai_ponder = False
+        # Presupuesto de esa búsqueda: compite por el GIL con la GUI mientras dura
+        self.ai_ponder_time_limit = PONDER_TIME_LIMIT
+        self.ai_ponder_node_limit = None
+        self._ai_job = None
+        self._ponder_job = None
+
+    @property
+    def board(self):
+        return self._board
+
+    @board.setter
+    def board(self, board):
+        """Asignar un tablero nuevo reconstruye `position`; los pasos del juego la actualizan en el sitio."""
+        self._board = board
+        # Copia de bitboards del tablero con los mapas incrementales de congeladas y apoyo de trampas
+        self.position = Position.from_board(board)
 
     def initialize_board(self):
         """Inicializa el tablero con las piezas en sus posiciones iniciales."""
@@ -51,7 +90,7 @@ class ArimaaGame:
         if not piece:
             raise ValueError("No hay pieza en la posición inicial.")
 
-        # Verificar si la pieza está congelada
+        # Verificar si la pieza está congelada (mapa incremental de la posición)
         if self.is_frozen(start):
             raise ValueError("La pieza está congelada y no puede moverse.")
 
@@ -80,177 +119,272 @@ class ArimaaGame:
         # Si todas las validaciones pasan, realizamos el movimiento
         self.board[start_row][start_col] = None
         self.board[end_row][end_col] = piece
+        self.position.move(start_row * 8 + start_col, end_row * 8 + end_col)
         self.steps_taken += 1
-        print(f"{piece} movido de {start} a {end}")
+        self.turn_moves.append((start, end))
+        logger.debug("%s movido de %s a %s", piece, start, end)
 
     def make_best_move(self):
-        """Realiza el mejor movimiento usando el algoritmo minimax."""
-        for _ in range(4 - self.steps_taken):
-            best_move = find_best_move(self.board, self.current_player)
-            if best_move:
-                if len(best_move) == 2:
-                    # Movimiento simple
-                    start, end = best_move
-                    if start != end:
-                        self.move_piece(start, end)
-                        self.check_trap_positions(self.trap_positions)
-                        print(f"IA realizó el movimiento de {start} a {end}")
-                        # Actualiza el tablero
-                        if self.gui:
-                            self.gui.draw_board()
-                            self.gui.draw_pieces()
-                            pygame.display.flip()
-                elif len(best_move) == 4:
-                    # Movimiento de empuje/jalón
-                    move_type, origin, affected, destination = best_move
-                    if move_type == "push":
-                        self.push_piece(origin, affected, destination)
-                        print(f"IA realizó empuje desde {origin} a {destination}")
-                        # Actualiza el tablero
-                        if self.gui:
-                            self.gui.draw_board()
-                            self.gui.draw_pieces()
-                            pygame.display.flip()
-                    elif move_type == "pull":
-                        self.pull_piece(origin, affected, destination)
-                        print(f"IA realizó jalón desde {origin} a {destination}")
-                        # Actualiza el tablero
-                        if self.gui:
-                            self.gui.draw_board()
-                            self.gui.draw_pieces()
-                            pygame.display.flip()
-                else:
-                    print("El mejor movimiento encontrado no es válido.")
+        """Busca el mejor turno completo con la IA y juega sus pasos."""
+        self.stop_ponder()
+        best_turn, self.last_search_stats = find_best_turn(
+            self.position, self.current_player, 4 - self.steps_taken,
+            time_limit=self.ai_time_limit, node_limit=self.ai_node_limit,
+            searcher=self.get_searcher(), return_stats=True, profile=self.ai_profile)
+        self.play_turn(best_turn)
+
+    def start_ai_search(self):
+        """Lanza la búsqueda de la IA en segundo plano; devuelve el SearchJob."""
+        self.stop_ponder()
+        # La posición se copia aquí: el hilo nunca lee self.board ni self.position
+        position = self.position.copy()
+        self._ai_job = SearchJob(find_best_turn, position, self.current_player, 4 - self.steps_taken,
+                                 time_limit=self.ai_time_limit, node_limit=self.ai_node_limit,
+                                 searcher=self.get_searcher(), return_stats=True, profile=self.ai_profile)
+        return self._ai_job
+
+    def ai_busy(self):
+        """True mientras la IA está buscando su turno."""
+        return self._ai_job is not None
+
+    def poll_ai(self):
+        """Si la búsqueda en segundo plano terminó, juega el turno de la IA; devuelve True si lo jugó."""
+        job = self._ai_job
+        if job is None or not job.done():
+            return False
+        self._ai_job = None
+        try:
+            best_turn, self.last_search_stats = job.result()
+            self.play_turn(best_turn)
+            self.finish_turn("black")
+            self.current_player = "white"
+            self.steps_taken = 0
+        except Exception as e:
+            self.handle_ai_error(e, self.trap_positions)
+            return True
+        if not self.check_ai_victory():
+            self.start_ponder()
+        return True
+
+    def start_ponder(self):
+        """Con ai_ponder, busca el turno del rival y la respuesta de la IA mientras el rival piensa.
+
+        La búsqueda profundiza turno a turno hasta TURN_SEARCH_DEPTH + 1 y se corta
+        al agotar ai_ponder_time_limit/ai_ponder_node_limit, aunque el rival no
+        haya movido. Lo que cuenta es lo que deja en la tabla de transposición: el
+        resultado se descarta. stop_ponder la cancela (budget.stop() del SearchJob)
+        al empezar la búsqueda de la IA y al cerrar la partida.
+        """
+        if not self.ai_ponder:
+            return
+        self.stop_ponder()
+        position = self.position.copy()
+        self._ponder_job = SearchJob(find_best_turn, position, self.current_player,
+                                     depth=TURN_SEARCH_DEPTH + 1, time_limit=self.ai_ponder_time_limit,
+                                     node_limit=self.ai_ponder_node_limit, searcher=self.get_searcher())
+
+    def stop_ponder(self):
+        """Cancela la búsqueda de fondo y espera a que suelte la tabla y los procesos."""
+        if self._ponder_job is not None:
+            self._ponder_job.cancel()
+            self._ponder_job.result()
+            self._ponder_job = None
+
+    def play_turn(self, best_turn):
+        """Juega en el tablero los pasos de un turno de la IA.
+
+        Devuelve, por cada movimiento jugado, la lista de casillas de trampa donde hubo capturas.
+        """
+        captures = []
+        if logger.isEnabledFor(logging.INFO) and self.last_search_stats is not None:
+            logger.info("IA: %s", self.last_search_stats.report())
+        if not best_turn:
+            logger.info("No hay movimientos disponibles para la IA.")
+        for best_move in best_turn:
+            if len(best_move) == 2:
+                # Movimiento simple
+                start, end = best_move
+                if start != end:
+                    self.move_piece(start, end)
+                    captures.append(self.check_trap_positions(self.trap_positions))
+                    logger.info("IA realizó el movimiento de %s a %s", start, end)
+                    self.notify_observers()
+            elif len(best_move) == 4:
+                # Movimiento de empuje/jalón
+                move_type, origin, affected, destination = best_move
+                if move_type == "push":
+                    self.push_piece(origin, affected, destination)
+                    captures.append(self.check_trap_positions(self.trap_positions))
+                    logger.info("IA realizó empuje desde %s a %s", origin, destination)
+                    self.notify_observers()
+                elif move_type == "pull":
+                    self.pull_piece(origin, affected, destination)
+                    captures.append(self.check_trap_positions(self.trap_positions))
+                    logger.info("IA realizó jalón desde %s a %s", origin, destination)
+                    self.notify_observers()
             else:
-                print("No hay movimientos disponibles para la IA.")
-        
+                logger.warning("El mejor movimiento encontrado no es válido.")
+        return captures
+
+    def start_recording(self, writer):
+        """Graba la partida desde el tablero actual en `writer` (GameRecordWriter), turno a turno."""
+        writer.begin_game(self.board)
+        self.recorder = writer
+
+    def finish_turn(self, player):
+        """Cierra el turno de `player`: pasa sus movimientos al historial y al registro si se graba."""
+        moves = tuple(self.turn_moves)
+        self.turn_moves = []
+        self.history.append((player, moves))
+        if self.recorder is not None and moves:
+            self.recorder.write_turn(player, moves)
+
+    def add_observer(self, callback):
+        """Registra `callback()` para redibujar tras cada paso de la IA."""
+        self.observers.append(callback)
+
+    def remove_observer(self, callback):
+        self.observers.remove(callback)
+
+    def notify_observers(self):
+        for callback in self.observers:
+            callback()
+
+    def get_searcher(self):
+        """Devuelve el pool de búsqueda de la partida, creándolo la primera vez (None si es secuencial)."""
+        if self.ai_workers <= 1:
+            return None
+        if self._searcher is None or self._searcher.workers != self.ai_workers:
+            self.close()
+            self._searcher = ParallelSearcher(self.ai_workers)
+        return self._searcher
+
+    def close(self):
+        """Detiene las búsquedas en curso y libera los procesos de búsqueda de la IA."""
+        self.stop_ponder()
+        if self._ai_job is not None:
+            self._ai_job.cancel()
+            self._ai_job.result()
+            self._ai_job = None
+        if self._searcher is not None:
+            self._searcher.close()
+            self._searcher = None
+
     def is_frozen(self, position):
-        return is_frozen(self.board, position)
+        row, col = position
+        return self.position.is_frozen(row * 8 + col)
 
     def check_trap_positions(self, trap_positions):
-        """Verifica si alguna pieza debe ser eliminada por estar en una trampa sin apoyo."""
+        """Retira todas las piezas sin apoyo en una trampa; devuelve sus casillas (lista vacía si ninguna).
+
+        Un empuje o jalón puede dejar dos piezas sin apoyo a la vez: se miran todas las trampas.
+        """
+        captured = []
         for row, col in trap_positions:
             piece = self.get_piece_at((row, col))
             if piece and not self.has_support((row, col)):
                 self.board[row][col] = None
-                return True
-        return False
+                self.position.remove(row * 8 + col)
+                captured.append((row, col))
+        return captured
 
     def has_support(self, position):
         """Verifica si una pieza en una posición tiene apoyo de aliados adyacentes."""
         row, col = position
-        piece = self.get_piece_at(position)
-        if not piece:
-            return False
-
-        allies = set("RCDHEA" if piece.isupper() else "rcdhea")
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            adj_row, adj_col = row + dr, col + dc
-            if 0 <= adj_row < 8 and 0 <= adj_col < 8:
-                adj_piece = self.get_piece_at((adj_row, adj_col))
-                if adj_piece in allies:
-                    return True
-        return False
+        return self.position.has_support(row * 8 + col)
     
     def push_piece(self, pusher_pos, pushed_pos, new_pos):
         """Empuja una pieza enemiga a una nueva posición."""
         if self.steps_taken + 2 > 4:
             raise ValueError("Empuje inválido: no se pueden tomar más de 4 pasos en un turno.")
         
-        new_board = push_piece(self.board, pusher_pos, pushed_pos, new_pos)
-        self.board = new_board
+        push_piece(self.board, pusher_pos, pushed_pos, new_pos)
+        self.position.push(pusher_pos[0] * 8 + pusher_pos[1], pushed_pos[0] * 8 + pushed_pos[1],
+                           new_pos[0] * 8 + new_pos[1])
         self.steps_taken += 2
+        self.turn_moves.append(("push", pusher_pos, pushed_pos, new_pos))
 
     def pull_piece(self, puller_pos, pulled_pos, new_pos):
         """Jala una pieza enemiga hacia la posición anterior del jalador."""
         if self.steps_taken + 2 > 4:
             raise ValueError("Jalada inválida: no se pueden tomar más de 4 pasos en un turno.")
         
-        new_board = pull_piece(self.board, puller_pos, pulled_pos, new_pos)
-        self.board = new_board
+        pull_piece(self.board, puller_pos, pulled_pos, new_pos)
+        self.position.pull(puller_pos[0] * 8 + puller_pos[1], pulled_pos[0] * 8 + pulled_pos[1],
+                           new_pos[0] * 8 + new_pos[1])
         self.steps_taken += 2
+        self.turn_moves.append(("pull", puller_pos, pulled_pos, new_pos))
 
     def check_victory_conditions(self):
-        """Verifica si se han cumplido las condiciones de victoria."""
-        black_rabbits = 0
-        white_rabbits = 0
-        black_has_moves = False
-        white_has_moves = False
-
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if not piece:
-                    continue
-
-                # Verificar conejos en el extremo del tablero
-                if piece == "R":
-                    black_rabbits += 1
-                    if row == 7:
-                        print("¡Black win!")
-                        self.end_game()
-                elif piece == "r":
-                    white_rabbits += 1
-                    if row == 0:
-                        print("¡White win!")
-                        self.end_game()
-
-                # Verificar si la pieza puede moverse (no está congelada)
-                if not self.is_frozen((row, col)):
-                    is_black = piece.isupper()
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        new_row, new_col = row + dr, col + dc
-                        if 0 <= new_row < 8 and 0 <= new_col < 8 and self.board[new_row][new_col] is None:
-                            if is_black:
-                                black_has_moves = True
-                            else:
-                                white_has_moves = True
-
-        # Condición de victoria por eliminación de conejos
-        if black_rabbits == 0:
-            print("¡White gana! (Black sin conejos)")
-            self.end_game()
-        if white_rabbits == 0:
-            print("¡Black gana! (White sin conejos)")
-            self.end_game()
-
-        # Condición de victoria por inmovilidad
-        if not black_has_moves:
-            print("¡White gana! (Black inmovilizado)")
-            self.end_game()
-        if not white_has_moves:
-            print("¡Black gana! (White inmovilizada)")
-            self.end_game()      
-    
+        """Devuelve el GameResult si la partida terminó con el turno que acaba de jugarse, o None.
+
+        Se llama con `current_player` ya cambiado: quien movió es el otro jugador.
+        """
+        mover = "black" if self.current_player == "white" else "white"
+        return self.position.outcome(COLORS[mover])
+
     def change_turn(self, trap_positions):
         """Cambia el turno y activa la IA para whites."""
+        if self.result is not None:
+            return
+        self.finish_turn(self.current_player)
         self.current_player = "black" if self.current_player == "white" else "white"
         self.steps_taken = 0
         
         # Validar estado
-        self.check_victory_conditions()
+        result = self.check_victory_conditions()
+        if result is not None:
+            self.end_game(result)
+            return
 
         # Activar IA para whites
         if self.current_player == "black":
+            if self.ai_async:
+                self.start_ai_search()  # La GUI juega el turno con poll_ai()
+                return
             try:
                 self.make_best_move() # IA
+                self.finish_turn("black")
                 self.current_player = "white"
                 self.steps_taken = 0
             except Exception as e:
-                 print(f"Error en movimiento de IA: {e}")
-                 if e.args[0] == "Se han tomado demasiados pasos en este turno." or e.args[0] == "Jalada inválida: no se pueden tomar más de 4 pasos en un turno." or e.args[0] == "Empuje inválido: no se pueden tomar más de 4 pasos en un turno.":
-                     self.change_turn(trap_positions)
-                     print("Se cambió el turno debido a un error en la IA.")
+                self.handle_ai_error(e, trap_positions)
+                return
+            if not self.check_ai_victory():
+                self.start_ponder()
 
-    def end_game(self):
-        """Finaliza el juego."""
+    def handle_ai_error(self, e, trap_positions):
+        """Informa de un error al jugar el turno de la IA y, si fue por exceso de pasos, pasa el turno."""
+        print(f"Error en movimiento de IA: {e}")
+        if e.args[0] == "Se han tomado demasiados pasos en este turno." or e.args[0] == "Jalada inválida: no se pueden tomar más de 4 pasos en un turno." or e.args[0] == "Empuje inválido: no se pueden tomar más de 4 pasos en un turno.":
+            self.change_turn(trap_positions)
+            print("Se cambió el turno debido a un error en la IA.")
+
+    def check_ai_victory(self):
+        """Tras el turno de la IA, termina la partida si ese turno la decidió; devuelve el GameResult o None."""
+        result = self.check_victory_conditions()
+        if result is not None:
+            self.end_game(result)
+        return result
+
+    def end_game(self, result):
+        """Finaliza el juego: guarda el resultado, libera la IA y avisa a los observadores."""
+        self.result = result
+        if self.recorder is not None:
+            self.recorder.write_result(result)
+        print(result.message())
         print("Juego terminado.")
-        raise SystemExit
+        self.close()
+        self.notify_observers()
 
-# Ejemplo de uso:
+# Ejemplo de uso (para analizar posiciones por lotes, ver arimaa_analyze.py):
 if __name__ == "__main__":
     game = ArimaaGame()
     print("Estado inicial del tablero:")
     for row in game.get_board_state():
         print(row)
-    game.make_best_move() # Este método no existe en la clase ArimaaGame
\ No newline at end of file
+    game.make_best_move()
+    print("Tras el primer turno de la IA:")
+    for row in game.get_board_state():
+        print(row)
+    game.close()
\ No newline at end of file
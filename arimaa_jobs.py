@@ -0,0 +1,42 @@
+# arimaa_jobs.py - Búsquedas de la IA en un hilo aparte
+#
+# La GUI lanza la búsqueda como un SearchJob y sigue atendiendo eventos; en cada
+# fotograma consulta done() y, cuando termina, recoge result(). cancel() usa el
+# presupuesto de la búsqueda, así que también detiene los procesos de
+# ParallelSearcher.
+import threading
+
+from arimaa_budget import SearchBudget
+
+
+class SearchJob:
+    """Ejecuta `search(*args, budget=..., **kwargs)` en un hilo; se puede consultar y cancelar."""
+
+    def __init__(self, search, *args, time_limit=None, node_limit=None, **kwargs):
+        self.budget = SearchBudget(time_limit, node_limit)
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(search, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, search, args, kwargs):
+        try:
+            self._result = search(*args, budget=self.budget, **kwargs)
+        except Exception as e:
+            self._error = e
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def cancel(self):
+        """Pide detener la búsqueda; result() devuelve lo mejor encontrado hasta entonces."""
+        self.budget.stop()
+
+    def result(self, timeout=None):
+        """Espera a que termine y devuelve el resultado (o relanza el error de la búsqueda)."""
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError("La búsqueda no ha terminado.")
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -0,0 +1,114 @@
+# arimaa_moves.py - Codificación de movimientos en un entero y búfers de movimientos por ply
+#
+# La búsqueda trabaja con movimientos empaquetados en un int:
+#   bits 0-5   casilla de origen (la pieza propia que se mueve, empuja o jala)
+#   bits 6-11  destino (del paso, de la pieza empujada o del que jala)
+#   bits 12-17 casilla de la pieza rival empujada o jalada
+#   bits 18-19 tipo: STEP, PUSH o PULL
+#   bits 20-23 trampas donde el movimiento captura una pieza (bit i = TRAP_SQUARES[i]),
+#              solo cuando el generador lo sabe (capturas de la quiescencia)
+# Fuera de la búsqueda (GUI, notación, API pública) se usan las tuplas de siempre:
+# ((fila, col), (fila, col)) o ("push"|"pull", origen, afectada, destino);
+# encode_move/decode_move convierten entre ambos formatos.
+from array import array
+
+from arimaa_tables import SQUARE_COORDS, TRAP_SQUARES
+
+STEP, PUSH, PULL = 0, 1, 2
+MOVE_TYPES = (None, "push", "pull")
+MOVE_TYPE_CODES = {"push": PUSH, "pull": PULL}
+
+DESTINATION_SHIFT = 6
+AFFECTED_SHIFT = 12
+TYPE_SHIFT = 18
+CAPTURE_SHIFT = 20
+SQUARE_BITS = 0x3F
+MOVE_MASK = (1 << CAPTURE_SHIFT) - 1  # El movimiento sin las capturas anotadas
+TYPE_MASK = 3 << TYPE_SHIFT
+
+MAX_MOVES = 512  # Cota de movimientos de una posición: 16 piezas x (4 pasos + 4 x 6 empujes/jalones)
+TRAP_BITS = {trap: 1 << index for index, trap in enumerate(TRAP_SQUARES)}
+
+
+def encode_step(from_sq, to_sq):
+    return from_sq | to_sq << DESTINATION_SHIFT
+
+
+def encode_push(origin, affected, destination):
+    """La pieza de `origin` empuja la de `affected` a `destination` y ocupa su casilla."""
+    return origin | destination << DESTINATION_SHIFT | affected << AFFECTED_SHIFT | PUSH << TYPE_SHIFT
+
+
+def encode_pull(origin, affected, destination):
+    """La pieza de `origin` pasa a `destination` y la de `affected` ocupa su casilla."""
+    return origin | destination << DESTINATION_SHIFT | affected << AFFECTED_SHIFT | PULL << TYPE_SHIFT
+
+
+def with_captures(code, traps):
+    """Anota en `code` las trampas (casillas) donde el movimiento captura."""
+    for trap in traps:
+        code |= TRAP_BITS[trap] << CAPTURE_SHIFT
+    return code
+
+
+def move_captures(code):
+    """Trampas anotadas en `code` (tupla vacía si no se anotaron)."""
+    bits = code >> CAPTURE_SHIFT
+    return tuple(trap for index, trap in enumerate(TRAP_SQUARES) if bits >> index & 1)
+
+
+def move_type(code):
+    return code >> TYPE_SHIFT & 3
+
+
+def step_cost(code):
+    """Pasos que consume un movimiento: 1 para un paso simple, 2 para empuje o jalón."""
+    return 2 if code & TYPE_MASK else 1
+
+
+def encode_move(move):
+    """Tupla de movimiento -> entero."""
+    if len(move) == 2:
+        (row, col), (end_row, end_col) = move
+        return encode_step(row * 8 + col, end_row * 8 + end_col)
+    kind, origin, affected, destination = move
+    if kind not in MOVE_TYPE_CODES:
+        raise ValueError(f"Tipo de movimiento inválido: {kind}")
+    return (origin[0] * 8 + origin[1] | (destination[0] * 8 + destination[1]) << DESTINATION_SHIFT
+            | (affected[0] * 8 + affected[1]) << AFFECTED_SHIFT | MOVE_TYPE_CODES[kind] << TYPE_SHIFT)
+
+
+def decode_move(code):
+    """Entero -> tupla de movimiento (las capturas anotadas se omiten)."""
+    origin = SQUARE_COORDS[code & SQUARE_BITS]
+    destination = SQUARE_COORDS[code >> DESTINATION_SHIFT & SQUARE_BITS]
+    kind = code >> TYPE_SHIFT & 3
+    if kind == STEP:
+        return (origin, destination)
+    return (MOVE_TYPES[kind], origin, SQUARE_COORDS[code >> AFFECTED_SHIFT & SQUARE_BITS], destination)
+
+
+def decode_turn(codes):
+    """Secuencia de enteros -> lista de tuplas de movimiento."""
+    return [decode_move(code) for code in codes]
+
+
+def new_move_buffer():
+    return array("I", bytes(4 * MAX_MOVES))
+
+
+class MoveBuffers:
+    """Un búfer de MAX_MOVES enteros por ply, reservado una vez y reutilizado en cada nodo.
+
+    Los generadores escriben en buffers[ply] y devuelven cuántos movimientos dejaron;
+    cada nivel de la búsqueda usa su propio ply para no pisar a los de arriba.
+    """
+
+    def __init__(self, plies=0):
+        self.buffers = [new_move_buffer() for _ in range(plies)]
+
+    def __getitem__(self, ply):
+        buffers = self.buffers
+        while len(buffers) <= ply:
+            buffers.append(new_move_buffer())
+        return buffers[ply]
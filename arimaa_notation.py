@@ -0,0 +1,154 @@
+# arimaa_notation.py - Notación estándar de movimientos de Arimaa
+#
+# Un turno se escribe como pasos separados por espacios: pieza, casilla y
+# dirección ("Ed2n"), y las capturas como pieza, trampa y "x" ("rc3x"). La
+# colocación inicial son pieza y casilla ("Ra1"). Las mayúsculas son Gold, que
+# aquí es Black (filas 0-1, avanza hacia la fila 7); el camello es "M" en la
+# notación y "A" en el tablero. La fila 0 es el rango 1 y la columna 0 la "a".
+from arimaa_bitboard import PIECE_CODES
+from arimaa_tables import PIECE_STRENGTH, SQUARE_COORDS
+
+NOTATION_PIECES = {"A": "M", "a": "m"}
+BOARD_PIECES = {"M": "A", "m": "a"}
+DIRECTIONS = {"n": (1, 0), "s": (-1, 0), "e": (0, 1), "w": (0, -1)}
+DIRECTION_NAMES = {delta: name for name, delta in DIRECTIONS.items()}
+SIDE_NAMES = {"g": "black", "s": "white", "w": "black", "b": "white"}  # Gold/Silver y White/Black antiguos
+
+# Colocación de ArimaaGame.initialize_board
+STANDARD_SETUP = {
+    "black": "Ra1 Rb1 Rc1 Rd1 Re1 Rf1 Rg1 Rh1 Ca2 Db2 Hc2 Md2 Ee2 Hf2 Dg2 Ch2",
+    "white": "ra8 rb8 rc8 rd8 re8 rf8 rg8 rh8 ca7 db7 hc7 md7 ee7 hf7 dg7 ch7",
+}
+
+
+def square_name(pos):
+    """(fila, columna) -> "a1"."""
+    row, col = pos
+    return "abcdefgh"[col] + str(row + 1)
+
+
+def parse_square(text):
+    """"a1" -> (fila, columna)."""
+    col = "abcdefgh".find(text[0])
+    if col < 0 or len(text) != 2 or not "1" <= text[1] <= "8":
+        raise ValueError(f"Casilla inválida: {text}")
+    return int(text[1]) - 1, col
+
+
+def piece_letter(piece):
+    return NOTATION_PIECES.get(piece, piece)
+
+
+def board_piece(letter):
+    piece = BOARD_PIECES.get(letter, letter)
+    if piece not in PIECE_CODES:
+        raise ValueError(f"Pieza inválida: {letter}")
+    return piece
+
+
+def move_to_steps(position, move):
+    """Aplica `move` a `position` y devuelve sus pasos en notación, capturas incluidas."""
+    # Ningún paso de un empuje o jalón mueve la casilla de origen del otro: basta la posición previa
+    squares = list(position.squares)
+    tokens = []
+    for from_sq, to_sq, captured, _ in position.make_step(move):
+        delta = ((to_sq >> 3) - (from_sq >> 3), (to_sq & 7) - (from_sq & 7))
+        tokens.append(piece_letter(PIECE_CODES[squares[from_sq]]) + square_name(SQUARE_COORDS[from_sq])
+                      + DIRECTION_NAMES[delta])
+        for trap, piece in captured:
+            tokens.append(piece_letter(PIECE_CODES[piece]) + square_name(SQUARE_COORDS[trap]) + "x")
+    return tokens
+
+
+def turn_to_notation(position, turn):
+    """Texto de un turno (secuencia de movimientos) jugado desde `position`, sin modificarla."""
+    position = position.copy()
+    tokens = []
+    for move in turn:
+        tokens.extend(move_to_steps(position, move))
+    return " ".join(tokens)
+
+
+def is_setup(text):
+    """True si el texto es una colocación inicial ("Ra1 Rb1 ...")."""
+    tokens = text.split()
+    return bool(tokens) and all(len(token) == 3 for token in tokens)
+
+
+def parse_setup(text):
+    """Colocación inicial -> lista de (pieza, (fila, columna))."""
+    return [(board_piece(token[0]), parse_square(token[1:3])) for token in text.split()]
+
+
+def parse_steps(text):
+    """Pasos de un turno -> lista de (pieza, origen, destino); las capturas se omiten."""
+    steps = []
+    for token in text.split():
+        if len(token) != 4:
+            raise ValueError(f"Paso inválido: {token}")
+        piece, (row, col), direction = board_piece(token[0]), parse_square(token[1:3]), token[3]
+        if direction == "x":
+            continue
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Dirección inválida: {token}")
+        dr, dc = DIRECTIONS[direction]
+        steps.append((piece, (row, col), (row + dr, col + dc)))
+    return steps
+
+
+def notation_to_turn(position, player, text):
+    """Convierte el texto de un turno de `player` en movimientos (pasos, empujes y jalones).
+
+    Un paso de una pieza rival es un empuje junto con el paso propio que entra en
+    su casilla; un paso propio seguido de un paso rival hacia la casilla que dejó
+    es un jalón si la pieza propia es más fuerte (si no, el paso rival es el
+    principio de un empuje). Comprueba que cada pieza esté donde dice la notación.
+    """
+    uppercase = player == "black"
+    steps = parse_steps(text)
+    position = position.copy()
+    turn = []
+    index = 0
+    while index < len(steps):
+        piece, origin, target = steps[index]
+        if position.piece_at(origin[0] * 8 + origin[1]) != piece:
+            raise ValueError(f"No hay {piece_letter(piece)} en {square_name(origin)}.")
+        following = steps[index + 1] if index + 1 < len(steps) else None
+        if piece.isupper() == uppercase:
+            if (following is not None and following[0].isupper() != uppercase and following[2] == origin
+                    and PIECE_STRENGTH[piece] > PIECE_STRENGTH[following[0]]):
+                turn.append(("pull", origin, following[1], target))
+                index += 2
+            else:
+                turn.append((origin, target))
+                index += 1
+        else:
+            if following is None or following[0].isupper() != uppercase or following[2] != origin:
+                raise ValueError(f"Empuje incompleto: {piece_letter(piece)}{square_name(origin)}.")
+            turn.append(("push", following[1], origin, target))
+            index += 2
+        # Los pasos siguientes se validan sobre la posición resultante
+        position.make_step(turn[-1])
+    return turn
+
+
+def board_from_aei(text):
+    """Tablero de setposition ("[rrrrrrrr...]", 64 casillas desde a8) -> tablero de ArimaaGame."""
+    cells = text.strip().strip("[]")
+    if len(cells) != 64:
+        raise ValueError("El tablero debe tener 64 casillas.")
+    board = [[None for _ in range(8)] for _ in range(8)]
+    for index, letter in enumerate(cells):
+        if letter not in " .x":
+            board[7 - index // 8][index % 8] = board_piece(letter)
+    return board
+
+
+def board_to_aei(board):
+    """Tablero de ArimaaGame -> texto de setposition."""
+    cells = []
+    for row in range(7, -1, -1):
+        for col in range(8):
+            piece = board[row][col]
+            cells.append(piece_letter(piece) if piece else " ")
+    return "[" + "".join(cells) + "]"
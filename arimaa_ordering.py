@@ -0,0 +1,106 @@
+# arimaa_ordering.py - Ordenación de movimientos (enteros de arimaa_moves) para alfa-beta
+from arimaa_bitboard import RABBIT
+from arimaa_moves import AFFECTED_SHIFT, DESTINATION_SHIFT, PUSH, TYPE_SHIFT
+from arimaa_tables import TRAP_MASK, NEIGHBOR_MASKS
+
+HASH_SCORE = 1 << 40        # Movimiento de la tabla o de la iteración anterior
+GOAL_SCORE = 1 << 36        # Conejo que llega a la meta
+CAPTURE_SCORE = 1 << 32     # Empuje o jalón que deja al enemigo sin apoyo en una trampa
+GOAL_THREAT_SCORE = 1 << 30  # Conejo que queda a un paso de la meta
+KILLER_SCORE = 1 << 28
+MAX_PLY = 64
+
+# Filas de meta y de amenaza por color
+GOAL_ROW = (7, 0)
+THREAT_ROW = (6, 1)
+
+
+class MoveOrderer:
+    """Primero el movimiento hash, luego capturas y conejos hacia la meta, killers e historia."""
+
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}  # Se conserva entre búsquedas
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Borra los killers y envejece la historia para que pese más lo reciente."""
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        self.history = {move: score >> 1 for move, score in self.history.items() if score > 1}
+
+    def tactical_score(self, position, move):
+        """Puntuación de capturas en trampa y pasos de conejo hacia la meta (0 si no aplica)."""
+        squares = position.squares
+        kind = move >> TYPE_SHIFT & 3
+        if not kind:
+            piece = squares[move & 0x3F]
+            if piece % 6 != RABBIT:
+                return 0
+            color = piece // 6
+            end_row = move >> DESTINATION_SHIFT + 3 & 7
+            if end_row == GOAL_ROW[color]:
+                return GOAL_SCORE
+            if end_row == THREAT_ROW[color]:
+                return GOAL_THREAT_SCORE
+            return 0
+        affected_sq = move >> AFFECTED_SHIFT & 0x3F
+        # Casilla donde termina la pieza enemiga
+        landing = move >> DESTINATION_SHIFT & 0x3F if kind == PUSH else move & 0x3F
+        if not TRAP_MASK >> landing & 1:
+            return 0
+        victim = squares[affected_sq]
+        support = NEIGHBOR_MASKS[landing] & position.occupied[victim // 6] & ~(1 << affected_sq)
+        if support:
+            return 0
+        return CAPTURE_SCORE + victim % 6
+
+    def order(self, position, moves, hash_move=None, ply=0):
+        """Devuelve `moves` en una lista, de más a menos prometedor."""
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history
+        tactical_score = self.tactical_score
+
+        def score(move):
+            if move == hash_move:
+                return HASH_SCORE
+            value = tactical_score(position, move)
+            if value:
+                return value
+            if move == killers[0]:
+                return KILLER_SCORE
+            if move == killers[1]:
+                return KILLER_SCORE - 1
+            return history.get(move, 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def record_cutoff(self, position, move, depth, ply, index):
+        """Registra un corte beta producido por el movimiento número `index`."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.tactical_score(position, move):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def reset_counters(self):
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def stats(self):
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "history_size": len(self.history),
+        }
@@ -0,0 +1,157 @@
+# arimaa_parallel.py - Búsqueda de la raíz repartida entre procesos
+#
+# Los turnos raíz se reparten de forma fija (el turno i va al trabajo i % workers)
+# y cada proceso los busca en orden. Los procesos comparten la mejor puntuación
+# exacta encontrada y el índice del turno que la dio, y la usan como cota alfa
+# (o beta para White). Un empate solo cuenta si lo logra un turno de índice menor,
+# y las tablas de los procesos solo cortan con entradas de la misma profundidad.
+# Así el resultado es siempre el primer turno con el mejor valor minimax, igual
+# que en la búsqueda secuencial, sin depender de qué proceso termine antes.
+import time
+
+import arimaa_ai
+from arimaa_budget import SearchBudget, SearchAborted
+
+DEFAULT_WORKERS = 1
+TIE_EPSILON = 1e-6  # Los valores de evaluación son múltiplos de 0.2
+POLL_INTERVAL = 0.01  # Segundos entre comprobaciones de stop() en el proceso principal
+NO_HOLDER = 1 << 30
+
+_shared_best = None
+_shared_holder = None
+_shared_lock = None
+_shared_stop = None
+
+
+class _SharedBudget(SearchBudget):
+    """Presupuesto de un proceso que además atiende la parada compartida."""
+
+    def tick(self):
+        if not self.nodes % self.CHECK_INTERVAL and _shared_stop.value:
+            self.stopped = True
+        super().tick()
+
+
+def _init_worker(best, holder, lock, stop):
+    global _shared_best, _shared_holder, _shared_lock, _shared_stop
+    _shared_best, _shared_holder, _shared_lock, _shared_stop = best, holder, lock, stop
+    arimaa_ai.transposition_table.exact_depth_only = True
+
+
+def _search_slice(task):
+    """Busca en orden los turnos raíz `indices`.
+
+    Devuelve ([(índice, valor, exacto)], nodos, completo, contadores).
+    """
+    position, player, root_turns, indices, child_search, depth, time_limit, node_limit = task
+    is_maximizing = player == "black"
+    sign = 1 if is_maximizing else -1
+    budget = _SharedBudget(time_limit, node_limit)
+    stats = arimaa_ai._begin_search()
+    table = arimaa_ai.transposition_table
+    results = []
+    for index in indices:
+        with _shared_lock:
+            best, holder = _shared_best.value, _shared_holder.value
+        # Cota desde el punto de vista del jugador raíz; se afloja para igualar a un índice mayor
+        bound = best - TIE_EPSILON if index < holder else best
+        if is_maximizing:
+            alpha, beta = bound, float('inf')
+        else:
+            alpha, beta = float('-inf'), -bound
+        turn = root_turns[index]
+        undos = [position.make_step(move) for move in turn]
+        try:
+            value = child_search(position, depth - 1, not is_maximizing, alpha, beta, budget)
+        except SearchAborted:
+            return results, budget.nodes, False, stats.counters(table)
+        for undo in reversed(undos):
+            position.unmake_step(undo)
+        exact = value * sign > bound
+        results.append((index, value, exact))
+        if exact:
+            with _shared_lock:
+                score = value * sign
+                if score > _shared_best.value or (score == _shared_best.value and index < _shared_holder.value):
+                    _shared_best.value = score
+                    _shared_holder.value = index
+    return results, budget.nodes, True, stats.counters(table)
+
+
+class ParallelSearcher:
+    """Pool de procesos reutilizable durante toda una partida."""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        import multiprocessing  # Importación diferida: el motor sin pool arranca más rápido
+        self.workers = workers
+        self._best = multiprocessing.Value('d', float('-inf'), lock=False)
+        self._holder = multiprocessing.Value('i', NO_HOLDER, lock=False)
+        self._lock = multiprocessing.Lock()
+        self._stop = multiprocessing.Value('b', 0, lock=False)
+        self._pool = multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(self._best, self._holder, self._lock, self._stop))
+        self.nodes = 0
+
+    def search_root(self, position, player, root_turns, child_search, depth, budget):
+        """Equivalente en paralelo de arimaa_ai._search_root."""
+        with self._lock:
+            self._best.value = float('-inf')
+            self._holder.value = NO_HOLDER
+        self._stop.value = 1 if budget.stopped else 0
+
+        time_limit = None
+        if budget.deadline is not None:
+            time_limit = max(0.0, budget.deadline - time.perf_counter())
+        node_limit = None
+        if budget.node_limit is not None:
+            node_limit = max(0, budget.node_limit - budget.nodes) // self.workers
+
+        tasks = [
+            (position, player, root_turns, list(range(worker, len(root_turns), self.workers)),
+             child_search, depth, time_limit, node_limit)
+            for worker in range(self.workers)
+        ]
+        pending = self._pool.map_async(_search_slice, tasks, chunksize=1)
+        while not pending.ready():
+            pending.wait(POLL_INTERVAL)
+            if budget.stopped:
+                self._stop.value = 1
+        slices = pending.get()
+
+        complete = True
+        best_index, best_value = None, None
+        sign = 1 if player == "black" else -1
+        for results, nodes, slice_complete, counters in slices:
+            budget.nodes += nodes
+            self.nodes += nodes
+            arimaa_ai.search_stats.merge(counters)
+            complete = complete and slice_complete
+            for index, value, exact in results:
+                if not exact:
+                    continue
+                if (best_index is None or value * sign > best_value * sign
+                        or (value == best_value and index < best_index)):
+                    best_index, best_value = index, value
+        if budget.node_limit is not None and budget.nodes > budget.node_limit:
+            budget.stopped = True
+        if best_index is None:
+            # Ningún valor superó la cota inicial (p. ej. todos -inf): como en la búsqueda secuencial
+            first = [result for results, _, _, _ in slices for result in results if result[0] == 0]
+            if not first:
+                return None, None, complete
+            best_index, best_value = 0, first[0][1]
+        return root_turns[best_index], best_value, complete
+
+    def stop(self):
+        """Detiene la búsqueda en curso en todos los procesos."""
+        self._stop.value = 1
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+# arimaa_perft.py - Perft: conteo de posiciones hoja para medir y validar el generador
+#
+# Uso:
+#   python arimaa_perft.py                  # ejecuta la batería y compara con los valores guardados
+#   python arimaa_perft.py --fen "<fen>" --mode turns --depth 1
+#   python arimaa_perft.py --selective      # cuenta con el generador selectivo de la búsqueda
+#
+# Modo "steps": cada nivel es un movimiento (paso, empuje o jalón) y los jugadores
+# alternan, igual que minimax. Modo "turns": cada nivel es un turno completo único
+# (iter_turns) y los jugadores alternan por turno.
+import argparse
+import sys
+import time
+
+from arimaa_ai import generate_move_codes, iter_turns
+from arimaa_bitboard import position_from_fen
+from arimaa_moves import MoveBuffers
+
+OPENING_FEN = "RRRRRRRR/CDHAEHDC/8/8/8/8/cdhaehdc/rrrrrrrr w"
+
+MIDDLEGAME_FEN = "R1R1R3/C3E1C1/1RHD2eR/1h3aR1/cA3H2/1d4d1/5h1c/rrrrrrrr w"
+TRAPS_FEN = "4R3/5C2/1Ed1rH2/2c2e2/2D5/2R2h2/2r2c2/8 b"
+GOAL_FEN = "8/r7/8/3e4/4E3/8/6R1/8 b"
+
+# (nombre, fen, modo, profundidad, nodos esperados) con todos los movimientos legales
+PERFT_SUITE = [
+    ("opening", OPENING_FEN, "steps", 1, 8),
+    ("opening", OPENING_FEN, "steps", 2, 64),
+    ("opening", OPENING_FEN, "steps", 3, 800),
+    ("opening", OPENING_FEN, "steps", 4, 10000),
+    ("opening", OPENING_FEN, "steps", 5, 140794),
+    ("opening", OPENING_FEN, "turns", 1, 3353),
+    ("middlegame", MIDDLEGAME_FEN, "steps", 1, 37),
+    ("middlegame", MIDDLEGAME_FEN, "steps", 2, 1129),
+    ("middlegame", MIDDLEGAME_FEN, "steps", 3, 40634),
+    ("middlegame", MIDDLEGAME_FEN, "steps", 4, 1214900),
+    ("middlegame", MIDDLEGAME_FEN, "turns", 1, 11705),
+    ("traps", TRAPS_FEN, "steps", 3, 11834),
+    ("traps", TRAPS_FEN, "steps", 4, 205571),
+    ("traps", TRAPS_FEN, "turns", 1, 5278),
+    ("goal", GOAL_FEN, "steps", 4, 1494),
+    ("goal", GOAL_FEN, "turns", 1, 146),
+    ("goal", GOAL_FEN, "turns", 2, 16632),
+]
+
+
+def _other(player):
+    return "white" if player == "black" else "black"
+
+
+def perft_steps(position, player, depth, selective=False, buffers=None):
+    """Hojas a `depth` movimientos alternando jugadores."""
+    if buffers is None:
+        buffers = MoveBuffers(depth)
+    buffer = buffers[depth]
+    count = generate_move_codes(position, player, buffer, selective)
+    if depth == 1:
+        return count
+    nodes = 0
+    opponent = _other(player)
+    for index in range(count):
+        undo = position.make_step(buffer[index])
+        nodes += perft_steps(position, opponent, depth - 1, selective, buffers)
+        position.unmake_step(undo)
+    return nodes
+
+
+def perft_turns(position, player, depth, selective=False):
+    """Hojas a `depth` turnos completos únicos alternando jugadores."""
+    nodes = 0
+    if depth == 1:
+        for _ in iter_turns(position, player, selective=selective):
+            nodes += 1
+        return nodes
+    opponent = _other(player)
+    for _ in iter_turns(position, player, selective=selective):
+        nodes += perft_turns(position, opponent, depth - 1, selective)
+    return nodes
+
+
+def perft(fen, mode, depth, selective=False):
+    """Devuelve (nodos, segundos) para una posición FEN."""
+    position, player = position_from_fen(fen)
+    counter = perft_steps if mode == "steps" else perft_turns
+    start = time.perf_counter()
+    nodes = counter(position, player, depth, selective)
+    return nodes, time.perf_counter() - start
+
+
+def run_suite(selective=False):
+    """Ejecuta la batería; devuelve True si todos los conteos coinciden."""
+    ok = True
+    print(f"{'posición':<12}{'modo':<7}{'prof':>5}{'nodos':>12}{'esperado':>12}{'nps':>12}  ")
+    for name, fen, mode, depth, expected in PERFT_SUITE:
+        nodes, seconds = perft(fen, mode, depth, selective)
+        nps = nodes / seconds if seconds else float('inf')
+        status = "" if selective else ("ok" if nodes == expected else "FALLO")
+        if not selective and nodes != expected:
+            ok = False
+        print(f"{name:<12}{mode:<7}{depth:>5}{nodes:>12}{'-' if selective else expected:>12}{nps:>12.0f}  {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft del generador de movimientos de Arimaa.")
+    parser.add_argument("--fen", help="posición a contar (por defecto, la batería completa)")
+    parser.add_argument("--mode", choices=("steps", "turns"), default="steps")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--selective", action="store_true",
+                        help="usar el generador selectivo de la búsqueda en lugar de todos los legales")
+    args = parser.parse_args()
+
+    if args.fen:
+        nodes, seconds = perft(args.fen, args.mode, args.depth, args.selective)
+        print(f"nodos {nodes}  tiempo {seconds:.3f} s  nps {nodes / seconds if seconds else 0:.0f}")
+    else:
+        sys.exit(0 if run_suite(args.selective) else 1)
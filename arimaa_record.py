@@ -0,0 +1,324 @@
+# arimaa_record.py - Registro binario compacto de partidas y reproducción en streaming
+#
+# Un archivo empieza con MAGIC y sigue con registros de una etiqueta ASCII:
+#   G                              empieza una partida
+#   S lado(1) colocación(8)        16 casillas de las dos filas de casa del lado, un nibble
+#                                  por casilla: fuerza + 1, 0 si está vacía
+#   T lado << 7 | n(1) n x 3       un turno: n movimientos enteros de arimaa_moves (3 bytes,
+#                                  little endian) con las trampas de sus capturas anotadas
+#   R ganador(1) motivo(1)         resultado (GameResult)
+# Las filas de casa son la 0 y la 1 para Black (Gold) y la 7 y la 6 para White (Silver).
+#
+# Los lectores trabajan registro a registro sobre el flujo, sin cargar el archivo:
+# iter_games() da cada partida como GameRecord y replay() la juega turno a turno
+# con las reglas de ArimaaGame. read_notation() lee partidas en notación estándar
+# ("1g Ra1 Rb1 ...", "2g Ed2n Ed3n ..."), una línea por turno, y convert_notation()
+# las pasa al formato binario.
+from arimaa_bitboard import COLORS, PIECE_CODES, PIECE_INDEX, PLAYERS, GameResult, Position
+from arimaa_moves import (MOVE_MASK, decode_move, encode_move, move_captures, new_move_buffer, step_cost,
+                          with_captures)
+from arimaa_notation import SIDE_NAMES, is_setup, notation_to_turn, parse_setup, piece_letter, square_name
+from arimaa_tables import SQUARE_COORDS
+
+MAGIC = b"ARG1"
+GAME, SETUP, TURN, RESULT = b"G", b"S", b"T", b"R"
+MOVE_BYTES = 3
+MAX_TURN_MOVES = 4
+REASONS = ("goal", "elimination", "immobilization")
+
+# Casillas de casa de cada color, en el orden de los nibbles de la colocación
+HOME_SQUARES = (tuple(range(16)), tuple(range(56, 64)) + tuple(range(48, 56)))
+
+
+def pack_setup(board, player):
+    """Colocación de `player` en el tablero de ArimaaGame -> 8 bytes."""
+    color = COLORS[player]
+    data = bytearray(8)
+    for index, sq in enumerate(HOME_SQUARES[color]):
+        piece = board[sq >> 3][sq & 7]
+        if piece is None:
+            continue
+        code = PIECE_INDEX[piece]
+        if code // 6 != color:
+            raise ValueError(f"Colocación inválida: {piece_letter(piece)} en {square_name(SQUARE_COORDS[sq])}.")
+        data[index >> 1] |= (code % 6 + 1) << (index & 1) * 4
+    return bytes(data)
+
+
+def unpack_setup(data, player):
+    """8 bytes -> lista de (pieza, (fila, columna)) de `player`."""
+    color = COLORS[player]
+    pieces = []
+    for index, sq in enumerate(HOME_SQUARES[color]):
+        nibble = data[index >> 1] >> (index & 1) * 4 & 0xF
+        if nibble:
+            pieces.append((PIECE_CODES[color * 6 + nibble - 1], SQUARE_COORDS[sq]))
+    return pieces
+
+
+def _check_home(board):
+    """Las piezas deben estar en las filas de casa de su color para poder empaquetarse."""
+    for row in range(8):
+        for col, piece in enumerate(board[row]):
+            if piece is not None and row * 8 + col not in HOME_SQUARES[PIECE_INDEX[piece] // 6]:
+                raise ValueError(f"Colocación inválida: {piece_letter(piece)} en {square_name((row, col))}.")
+
+
+class GameRecord:
+    """Una partida leída: colocaciones, turnos (jugador, movimientos enteros) y resultado."""
+
+    def __init__(self):
+        self.setups = {}  # jugador -> lista de (pieza, (fila, columna))
+        self.turns = []  # (jugador, tupla de movimientos enteros con capturas)
+        self.result = None  # GameResult o None
+
+    def initial_board(self):
+        board = [[None for _ in range(8)] for _ in range(8)]
+        for pieces in self.setups.values():
+            for piece, (row, col) in pieces:
+                board[row][col] = piece
+        return board
+
+    def __repr__(self):
+        return f"GameRecord({len(self.turns)} turnos, {self.result!r})"
+
+
+class GameRecordWriter:
+    """Escribe partidas en el formato binario sobre un flujo abierto en modo binario.
+
+    Lleva su propia Position para anotar las capturas de cada movimiento. Si el
+    flujo está al principio escribe MAGIC; así se puede abrir un archivo con "ab".
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = None
+        if stream.tell() == 0:
+            stream.write(MAGIC)
+
+    def begin_game(self, board):
+        """Empieza una partida con las colocaciones de `board` (solo piezas en sus filas de casa)."""
+        _check_home(board)
+        self.stream.write(GAME)
+        for player in PLAYERS:
+            self.stream.write(SETUP + bytes((COLORS[player],)) + pack_setup(board, player))
+        self.position = Position.from_board(board)
+
+    def write_turn(self, player, moves):
+        """Escribe un turno de `player`: movimientos como tuplas o enteros, en orden."""
+        if len(moves) > MAX_TURN_MOVES:
+            raise ValueError("Un turno tiene como máximo 4 movimientos.")
+        data = bytearray(TURN + bytes((COLORS[player] << 7 | len(moves),)))
+        for move in moves:
+            code = move if move.__class__ is int else encode_move(move)
+            code &= MOVE_MASK
+            traps = [trap for step in self.position.make_step(code) for trap, _ in step[2]]
+            data += with_captures(code, traps).to_bytes(MOVE_BYTES, "little")
+        self.stream.write(bytes(data))
+
+    def write_result(self, result):
+        self.stream.write(RESULT + bytes((COLORS[result.winner], REASONS.index(result.reason))))
+
+    def write_game(self, record):
+        """Escribe un GameRecord completo (por ejemplo, leído de notación)."""
+        self.begin_game(record.initial_board())
+        for player, moves in record.turns:
+            self.write_turn(player, moves)
+        if record.result is not None:
+            self.write_result(record.result)
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Registro de partida truncado.")
+    return data
+
+
+def iter_records(stream):
+    """Genera (etiqueta, datos) leyendo el flujo binario registro a registro."""
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("No es un archivo de partidas.")
+    while True:
+        tag = stream.read(1)
+        if not tag:
+            return
+        if tag == GAME:
+            yield tag, None
+        elif tag == SETUP:
+            data = _read_exact(stream, 9)
+            yield tag, (PLAYERS[data[0]], unpack_setup(data[1:], PLAYERS[data[0]]))
+        elif tag == TURN:
+            header = _read_exact(stream, 1)[0]
+            count = header & 0x7F
+            data = _read_exact(stream, count * MOVE_BYTES)
+            moves = tuple(int.from_bytes(data[index:index + MOVE_BYTES], "little")
+                          for index in range(0, len(data), MOVE_BYTES))
+            yield tag, (PLAYERS[header >> 7], moves)
+        elif tag == RESULT:
+            winner, reason = _read_exact(stream, 2)
+            yield tag, GameResult(PLAYERS[winner], REASONS[reason])
+        else:
+            raise ValueError(f"Etiqueta de registro desconocida: {tag!r}")
+
+
+def iter_games(stream):
+    """Genera un GameRecord por partida del flujo binario; solo hay una partida en memoria."""
+    record = None
+    for tag, data in iter_records(stream):
+        if tag == GAME:
+            if record is not None:
+                yield record
+            record = GameRecord()
+        elif record is None:
+            raise ValueError("Registro fuera de una partida.")
+        elif tag == SETUP:
+            player, pieces = data
+            record.setups[player] = pieces
+        elif tag == TURN:
+            record.turns.append(data)
+        else:
+            record.result = data
+    if record is not None:
+        yield record
+
+
+def replay(games):
+    """Juega cada partida con las reglas de ArimaaGame; genera (número de partida, jugador, turno, juego).
+
+    `games` es un flujo binario o un iterable de GameRecord (por ejemplo,
+    read_notation()). `turno` son los movimientos como tuplas y `juego` es el
+    ArimaaGame tras jugarlos, que se reutiliza: hay que copiar lo que se quiera
+    conservar. Un movimiento ilegal (según generate_move_codes con todos los
+    legales), un turno de más de cuatro pasos o unas capturas distintas de las
+    anotadas al grabarlo lanzan ValueError.
+    """
+    from arimaa_ai import MAX_STEPS, generate_move_codes  # Importación diferida, como la lógica de juego
+    from arimaa_game_logic import ArimaaGame  # Importación diferida: la lógica importa la IA
+
+    if hasattr(games, "read"):
+        games = iter_games(games)
+    buffer = new_move_buffer()
+    for number, record in enumerate(games):
+        game = ArimaaGame()
+        game.board = record.initial_board()
+        for player, moves in record.turns:
+            game.current_player = player
+            game.steps_taken = 0
+            turn = [decode_move(move) for move in moves]
+            # Las reglas de ArimaaGame no validan empujes ni jalones: se comprueba antes
+            position = game.position.copy()
+            steps = 0
+            for move in moves:
+                code = move & MOVE_MASK
+                count = generate_move_codes(position, player, buffer, selective=False)
+                steps += step_cost(code)
+                if code not in buffer[:count] or steps > MAX_STEPS:
+                    raise ValueError(f"Movimiento ilegal en la partida {number}: {decode_move(code)} "
+                                     f"de {player}.")
+                position.make_step(code)
+            captures = game.play_turn(turn)
+            for move, seen in zip(moves, captures):
+                recorded = sorted(SQUARE_COORDS[trap] for trap in move_captures(move))
+                if sorted(seen) != recorded:
+                    raise ValueError(f"Capturas distintas de las registradas en la partida {number}: "
+                                     f"{[square_name(pos) for pos in seen]} en lugar de "
+                                     f"{[square_name(pos) for pos in recorded]}.")
+            game.finish_turn(player)
+            # Como tras change_turn: check_victory_conditions() mira el turno recién jugado
+            game.current_player = "white" if player == "black" else "black"
+            yield number, player, turn, game
+
+
+def read_notation(lines):
+    """Genera un GameRecord por partida de un texto en notación estándar, línea a línea.
+
+    Cada línea es un turno ("12g Ed2n Ed3n Ee4n Ee5x"); "1g" con colocación
+    empieza una partida nueva y una línea vacía la termina. Las líneas con número
+    de turno pero sin pasos (partida terminada, abandono) se ignoran.
+    """
+    record = None
+    position = None
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            if record is not None:
+                yield _finish_record(record, position)
+            record = None
+            continue
+        label, text = tokens[0], " ".join(tokens[1:])
+        if not label[:-1].isdigit() or label[-1] not in SIDE_NAMES:
+            raise ValueError(f"Número de turno inválido: {label}")
+        player = SIDE_NAMES[label[-1]]
+        if is_setup(text):
+            if record is not None and record.turns:
+                yield _finish_record(record, position)
+                record = None
+            if record is None:
+                record = GameRecord()
+                position = None
+            record.setups[player] = parse_setup(text)
+            continue
+        if record is None:
+            raise ValueError("Turno antes de la colocación inicial.")
+        if not text:
+            continue
+        if position is None:
+            position = Position.from_board(record.initial_board())
+        moves = []
+        for move in notation_to_turn(position, player, text):
+            code = encode_move(move)
+            traps = [trap for step in position.make_step(code) for trap, _ in step[2]]
+            moves.append(with_captures(code, traps))
+        record.turns.append((player, tuple(moves)))
+    if record is not None:
+        yield _finish_record(record, position)
+
+
+def _finish_record(record, position):
+    """El resultado de una partida leída de notación sale de su posición final."""
+    if position is not None and record.turns:
+        record.result = position.outcome(COLORS[record.turns[-1][0]])
+    return record
+
+
+def convert_notation(lines, stream):
+    """Pasa las partidas en notación de `lines` al formato binario; devuelve cuántas escribió."""
+    writer = GameRecordWriter(stream)
+    count = 0
+    for record in read_notation(lines):
+        writer.write_game(record)
+        count += 1
+    return count
+
+
+def turn_captures(moves):
+    """Trampas donde hubo capturas en un turno leído (según lo anotado al escribirlo)."""
+    return [trap for move in moves for trap in move_captures(move)]
+
+
+def _check_double_capture():
+    """Un empuje que captura dos piezas a la vez; devuelve True si replay las ve igual que Position.
+
+    El elefante de White en e3 empuja al perro de d3 a la trampa c3 y, al
+    dejar e3, su gato de la trampa f3 se queda sin apoyo: caen los dos.
+    """
+    record = GameRecord()
+    record.setups = {"black": [("D", (2, 3)), ("R", (0, 0))],
+                     "white": [("e", (2, 4)), ("c", (2, 5)), ("r", (7, 7))]}
+    position = Position.from_board(record.initial_board())
+    moves = []
+    for move in (("push", (2, 4), (2, 3), (2, 2)), ((2, 3), (3, 3))):
+        code = encode_move(move)
+        traps = [trap for step in position.make_step(code) for trap, _ in step[2]]
+        moves.append(with_captures(code, traps))
+    record.turns.append(("white", tuple(moves)))
+    for _, _, _, game in replay([record]):
+        board = game.board
+    return len(move_captures(moves[0])) == 2 and board[2][2] is None and board[2][5] is None
+
+
+if __name__ == "__main__":
+    ok = _check_double_capture()
+    print("captura doble en un empuje: " + ("ok" if ok else "FALLO"))
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,167 @@
+# arimaa_stats.py - Estadísticas de búsqueda y perfilado opcional
+#
+# La búsqueda actualiza los contadores de un SearchStats en lugar de imprimir;
+# find_best_move/find_best_turn lo devuelven con return_stats=True. El perfilador
+# solo envuelve las funciones mientras está activo, así que sin él no hay coste.
+import threading
+import time
+
+from arimaa_bitboard import Position
+
+PROFILE_SECTIONS = ("movegen", "eval", "make_unmake")
+# Las funciones envueltas son del proceso: solo puede haber un perfilador activo
+_profiler_lock = threading.Lock()
+
+
+class SearchStats:
+    """Contadores y resultado de una búsqueda."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.quiescence_nodes = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.depths = []  # (profundidad, segundos, nodos acumulados, valor, completa)
+        self.pv = []
+        self.best = None
+        self.value = None
+        self.depth = 0
+        self.elapsed = 0.0
+        self.profile = None  # {sección: segundos} si se pidió perfilar
+        self.goal_threat = False  # El rival llegaba a la meta en su próximo turno
+        self.pruned = 0  # Turnos raíz descartados por perder a la meta
+        self.cache_hit = False  # El resultado salió de la caché de análisis sin buscar
+        self._start = time.perf_counter()
+        self._tt_base = (0, 0)
+
+    def begin(self, table):
+        """Empieza a contar; los aciertos de la tabla se miden como diferencia."""
+        self._start = time.perf_counter()
+        self._tt_base = (table.probes, table.hits)
+
+    def finish(self, table, budget):
+        self.nodes = budget.nodes
+        self.tt_probes += table.probes - self._tt_base[0]
+        self.tt_hits += table.hits - self._tt_base[1]
+        self.elapsed = time.perf_counter() - self._start
+
+    def record_depth(self, depth, nodes, value, complete):
+        self.depths.append((depth, time.perf_counter() - self._start, nodes, value, complete))
+
+    def counters(self, table):
+        """(hojas, quiescencia, cortes, sondeos, aciertos) desde begin(), para enviarlos a otro proceso."""
+        return (self.leaf_evals, self.quiescence_nodes, self.cutoffs,
+                table.probes - self._tt_base[0], table.hits - self._tt_base[1])
+
+    def merge(self, counters):
+        """Suma los contadores de counters() de un proceso de búsqueda."""
+        leaf_evals, quiescence_nodes, cutoffs, tt_probes, tt_hits = counters
+        self.leaf_evals += leaf_evals
+        self.quiescence_nodes += quiescence_nodes
+        self.cutoffs += cutoffs
+        self.tt_probes += tt_probes
+        self.tt_hits += tt_hits
+
+    @property
+    def nps(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def as_dict(self):
+        return {
+            "best": self.best,
+            "value": self.value,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "quiescence_nodes": self.quiescence_nodes,
+            "cutoffs": self.cutoffs,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": self.tt_hit_rate,
+            "elapsed": self.elapsed,
+            "nps": self.nps,
+            "depths": list(self.depths),
+            "pv": list(self.pv),
+            "goal_threat": self.goal_threat,
+            "pruned": self.pruned,
+            "cache_hit": self.cache_hit,
+            "profile": dict(self.profile) if self.profile is not None else None,
+        }
+
+    def report(self):
+        """Resumen de una línea."""
+        text = (f"prof {self.depth}  valor {self.value}  nodos {self.nodes}  hojas {self.leaf_evals}  quiescencia {self.quiescence_nodes}  "
+                f"cortes {self.cutoffs}  TT {self.tt_hits}/{self.tt_probes}  "
+                f"{self.elapsed:.3f} s  {self.nps:.0f} nps")
+        if self.goal_threat:
+            text += "  amenaza de meta"
+        if self.pruned:
+            text += f"  {self.pruned} turnos descartados"
+        if self.cache_hit:
+            text += "  de la caché"
+        if self.profile:
+            text += "  " + "  ".join(f"{name} {seconds:.3f} s" for name, seconds in self.profile.items())
+        return text
+
+
+class SearchProfiler:
+    """Mide el tiempo en generación de movimientos, evaluación y make/unmake.
+
+    Mientras está activo reemplaza arimaa_ai.generate_move_codes, arimaa_ai.evaluate_board
+    (y arimaa_ai.evaluate_children si la evaluación por lotes está activa) y
+    Position.make_step/unmake_step por versiones cronometradas. Solo mide el
+    hilo que lo activa: las búsquedas de otros hilos (SearchJob, pensar en el
+    turno del rival, AEI) pasan por las funciones originales sin contar. Tampoco
+    mide otros procesos: con ParallelSearcher la búsqueda de los procesos no se
+    perfila. Como las funciones son compartidas, activar un segundo perfilador
+    mientras hay otro activo (en cualquier hilo) lanza RuntimeError.
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(PROFILE_SECTIONS, 0.0)
+        self._saved = None
+        self._thread = None
+
+    def _timed(self, section, function):
+        times = self.times
+        clock = time.perf_counter
+        owner = self._thread
+        get_ident = threading.get_ident
+
+        def wrapper(*args, **kwargs):
+            if get_ident() != owner:
+                return function(*args, **kwargs)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[section] += clock() - start
+        return wrapper
+
+    def __enter__(self):
+        import arimaa_ai  # Importación diferida: arimaa_ai importa este módulo
+        if not _profiler_lock.acquire(blocking=False):
+            raise RuntimeError("Ya hay un perfilador de búsqueda activo.")
+        self._thread = threading.get_ident()
+        self._saved = (arimaa_ai.generate_move_codes, arimaa_ai.evaluate_board, arimaa_ai.evaluate_children,
+                       Position.make_step, Position.unmake_step)
+        arimaa_ai.generate_move_codes = self._timed("movegen", arimaa_ai.generate_move_codes)
+        arimaa_ai.evaluate_board = self._timed("eval", arimaa_ai.evaluate_board)
+        if arimaa_ai.evaluate_children is not None:
+            arimaa_ai.evaluate_children = self._timed("eval", arimaa_ai.evaluate_children)
+        Position.make_step = self._timed("make_unmake", Position.make_step)
+        Position.unmake_step = self._timed("make_unmake", Position.unmake_step)
+        return self
+
+    def __exit__(self, *exc):
+        import arimaa_ai
+        (arimaa_ai.generate_move_codes, arimaa_ai.evaluate_board, arimaa_ai.evaluate_children,
+         Position.make_step, Position.unmake_step) = self._saved
+        self._saved = self._thread = None
+        _profiler_lock.release()
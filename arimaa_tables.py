@@ -0,0 +1,45 @@
+# arimaa_tables.py - Tablas estáticas precalculadas compartidas por las reglas y el motor
+#
+# Casillas numeradas 0..63 como fila * 8 + columna. Las vecinas van siempre en el
+# orden arriba, abajo, izquierda, derecha.
+
+SQUARE_COORDS = tuple((sq >> 3, sq & 7) for sq in range(64))
+
+
+def _build_neighbors(sq):
+    row, col = SQUARE_COORDS[sq]
+    result = []
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        adj_row, adj_col = row + dr, col + dc
+        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
+            result.append(adj_row * 8 + adj_col)
+    return tuple(result)
+
+
+NEIGHBORS = tuple(_build_neighbors(sq) for sq in range(64))
+NEIGHBOR_MASKS = tuple(sum(1 << adj for adj in NEIGHBORS[sq]) for sq in range(64))
+# Las mismas vecinas como coordenadas, para el tablero de listas: ADJACENT[fila][columna]
+ADJACENT = tuple(
+    tuple(tuple(SQUARE_COORDS[adj] for adj in NEIGHBORS[row * 8 + col]) for col in range(8))
+    for row in range(8)
+)
+
+TRAP_SQUARES = (18, 21, 42, 45)
+TRAP_POSITIONS = tuple(SQUARE_COORDS[sq] for sq in TRAP_SQUARES)
+TRAP_POSITION_SET = frozenset(TRAP_POSITIONS)
+TRAP_MASK = sum(1 << sq for sq in TRAP_SQUARES)
+# Casillas guardianas de cada trampa (sus vecinas)
+TRAP_GUARDS = {trap: NEIGHBORS[trap] for trap in TRAP_SQUARES}
+TRAP_GUARD_SQUARES = frozenset(guard for guards in TRAP_GUARDS.values() for guard in guards)
+TRAP_GUARD_MASK = sum(1 << sq for sq in TRAP_GUARD_SQUARES)
+# Índice en TRAP_SQUARES de la trampa que guarda cada casilla, o -1 (ninguna casilla guarda dos)
+GUARDED_TRAP = tuple(
+    next((index for index, trap in enumerate(TRAP_SQUARES) if sq in TRAP_GUARDS[trap]), -1) for sq in range(64)
+)
+TRAP_INDEX = {trap: index for index, trap in enumerate(TRAP_SQUARES)}
+
+PIECE_STRENGTH = {
+    "E": 5, "A": 4, "H": 3, "D": 2, "C": 1, "R": 0,
+    "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0
+}
+PIECE_COLOR = {code: "black" if code.isupper() else "white" for code in PIECE_STRENGTH}
@@ -0,0 +1,324 @@
+# arimaa_tournament.py - Partidas del motor contra sí mismo entre dos configuraciones
+#
+# Uso: python arimaa_tournament.py [--games N] [--workers N] [--time SEGUNDOS] [--depth N] [--nodes N]
+#          [--a PESO=VALOR ...] [--b PESO=VALOR ...] [--random-setup] [--random-turns N] [--output ARCHIVO]
+# Cada configuración es un juego de pesos de arimaa_eval (los de WEIGHT_NAMES) más
+# el presupuesto de búsqueda por turno. Las partidas se juegan por parejas desde la
+# misma apertura, una con cada color, repartidas entre procesos; dentro de un proceso
+# cada motor tiene su propia tabla de transposición y su propio MoveOrderer. La
+# apertura puede ser una colocación aleatoria y/o unos turnos aleatorios.
+#
+# Al final se informa victorias, derrotas y tablas de A, la diferencia de Elo con su
+# intervalo del 95 % y, por motor, nodos por segundo y segundos por turno. Con
+# `--output` las partidas se guardan en el formato binario de arimaa_record, que
+# replay() puede reproducir. Una partida sin ganador tras `max_turns` turnos, o que
+# repite una posición por tercera vez, es tablas.
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import arimaa_ai
+import arimaa_eval
+from arimaa_bitboard import COLORS, ZOBRIST_SIDE, GameResult, Position
+from arimaa_moves import encode_move, step_cost
+from arimaa_notation import STANDARD_SETUP, parse_setup
+from arimaa_ordering import MoveOrderer
+from arimaa_record import HOME_SQUARES, GameRecordWriter
+from arimaa_transposition import TranspositionTable
+
+DEFAULT_GAMES = 20
+DEFAULT_TIME_LIMIT = 0.5  # Segundos por turno
+MAX_TURNS = 200  # Turnos (de los dos jugadores) antes de dar la partida por tablas
+ELO_Z = 1.96  # Intervalo del 95 %
+OTHER = {"black": "white", "white": "black"}
+
+DEFAULT_WEIGHTS = {name: getattr(arimaa_eval, name) for name in arimaa_eval.WEIGHT_NAMES}
+
+# Estado de cada proceso: pesos activos y (tabla, orderer) por motor
+_active_weights = DEFAULT_WEIGHTS
+_engine_state = {}
+
+
+class EngineConfig:
+    """Una configuración del motor: pesos distintos de los por defecto y presupuesto por turno."""
+
+    def __init__(self, name, weights=None, time_limit=DEFAULT_TIME_LIMIT, node_limit=None, depth=None):
+        for weight in weights or ():
+            if weight not in DEFAULT_WEIGHTS:
+                raise ValueError(f"Peso de evaluación desconocido: {weight}")
+        self.name = name
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.depth = depth
+
+    def __repr__(self):
+        changed = {name: value for name, value in self.weights.items() if DEFAULT_WEIGHTS[name] != value}
+        return f"EngineConfig({self.name!r}, {changed})"
+
+
+class EngineUsage:
+    """Nodos, segundos y turnos acumulados por un motor."""
+
+    __slots__ = ("nodes", "seconds", "turns")
+
+    def __init__(self):
+        self.nodes = 0
+        self.seconds = 0.0
+        self.turns = 0
+
+    def add(self, other):
+        self.nodes += other.nodes
+        self.seconds += other.seconds
+        self.turns += other.turns
+
+    @property
+    def nps(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def seconds_per_turn(self):
+        return self.seconds / self.turns if self.turns else 0.0
+
+
+def standard_board():
+    board = [[None for _ in range(8)] for _ in range(8)]
+    for player in ("black", "white"):
+        for piece, (row, col) in parse_setup(STANDARD_SETUP[player]):
+            board[row][col] = piece
+    return board
+
+
+def random_setup(rng):
+    """Tablero con las piezas de cada color barajadas en sus dos filas de casa."""
+    board = standard_board()
+    for squares in HOME_SQUARES:
+        pieces = [board[sq >> 3][sq & 7] for sq in squares]
+        rng.shuffle(pieces)
+        for sq, piece in zip(squares, pieces):
+            board[sq >> 3][sq & 7] = piece
+    return board
+
+
+def random_turns(rng, board, count):
+    """Hasta `count` turnos aleatorios desde `board`, empezando Black: lista de (jugador, movimientos)."""
+    position = Position.from_board(board)
+    player = "black"
+    turns = []
+    for _ in range(count):
+        codes = []
+        steps = rng.randint(1, arimaa_ai.MAX_STEPS)
+        while steps:
+            moves = [code for code in map(encode_move, arimaa_ai.generate_moves(position, player, selective=False))
+                     if step_cost(code) <= steps]
+            if not moves:
+                break
+            code = rng.choice(moves)
+            position.make_step(code)
+            codes.append(code)
+            steps -= step_cost(code)
+        # Un turno que deja la partida decidida no sirve como apertura
+        if not codes or position.outcome(COLORS[player]) is not None:
+            break
+        turns.append((player, tuple(codes)))
+        player = OTHER[player]
+    return turns
+
+
+def _use_engine(index, engine, position):
+    """Activa en este proceso los pesos, la tabla y el orderer del motor `index`."""
+    global _active_weights
+    if engine.weights != _active_weights:
+        arimaa_ai.configure_evaluation(**engine.weights)
+        _active_weights = engine.weights
+    position.score = position.compute_score()
+    arimaa_ai.transposition_table, arimaa_ai.move_orderer = _engine_state[index]
+
+
+def play_game(task):
+    """Juega una partida en el proceso actual; devuelve (número, turnos, resultado, usos por motor).
+
+    `engines` es (A, B) y `a_player` el color de A. Los turnos son (jugador,
+    movimientos enteros), apertura incluida; el resultado es None si hubo tablas
+    (`max_turns` turnos o una posición repetida por tercera vez).
+    """
+    number, engines, a_player, board, opening, max_turns = task
+    for index in range(len(engines)):
+        if index not in _engine_state:
+            _engine_state[index] = (TranspositionTable(), MoveOrderer())
+        else:
+            _engine_state[index][0].clear()
+    players = {a_player: 0, OTHER[a_player]: 1}
+    usage = (EngineUsage(), EngineUsage())
+    position = Position.from_board(board)
+    turns = list(opening)
+    player = "black"
+    for player, codes in opening:
+        for code in codes:
+            position.make_step(code)
+        player = OTHER[player]
+    # El motor no aplica la regla de la triple repetición: la tercera vez se dan tablas
+    seen = {}
+    result = None
+    while result is None and len(turns) < max_turns:
+        key = position.key ^ ZOBRIST_SIDE if player == "black" else position.key
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] == 3:
+            break
+        index = players[player]
+        engine = engines[index]
+        _use_engine(index, engine, position)
+        start = time.perf_counter()
+        turn, stats = arimaa_ai.find_best_turn(position, player, depth=engine.depth, time_limit=engine.time_limit,
+                                               node_limit=engine.node_limit, return_stats=True)
+        usage[index].seconds += time.perf_counter() - start
+        usage[index].nodes += stats.nodes
+        usage[index].turns += 1
+        if not turn:
+            result = GameResult(OTHER[player], "immobilization")
+            break
+        codes = tuple(encode_move(move) for move in turn)
+        for code in codes:
+            position.make_step(code)
+        turns.append((player, codes))
+        result = position.outcome(COLORS[player])
+        player = OTHER[player]
+    return number, turns, result, usage
+
+
+def elo_estimate(wins, losses, draws):
+    """Diferencia de Elo de A sobre B y semiancho de su intervalo del 95 %: (elo, margen).
+
+    El intervalo de la puntuación es el de Wilson con la varianza binomial p(1 - p),
+    la mayor posible para esa media: las tablas no lo estrechan, así que un
+    enfrentamiento sin partidas decididas no da un margen nulo.
+    """
+    games = wins + losses + draws
+    if not games:
+        return 0.0, math.inf
+    score = (wins + draws / 2) / games
+    z2 = ELO_Z ** 2 / games
+    center = (score + z2 / 2) / (1 + z2)
+    half = ELO_Z / (1 + z2) * math.sqrt(score * (1 - score) / games + z2 / (4 * games))
+    low, high = _elo(center - half), _elo(center + half)
+    # Con todo victorias o todo derrotas un extremo es infinito
+    return _elo(score), (high - low) / 2 if math.isfinite(high - low) else math.inf
+
+
+def _elo(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+def run_match(engine_a, engine_b, games=DEFAULT_GAMES, workers=None, random_setups=False, opening_turns=0,
+              max_turns=MAX_TURNS, seed=0, output=None, log=None):
+    """Juega `games` partidas entre A y B y devuelve (victorias, derrotas, tablas de A, usos de A y B).
+
+    Las partidas 2k y 2k+1 comparten apertura y A juega con Black en las pares.
+    `output` es un flujo binario donde se escriben las partidas según terminan y
+    `log` un flujo de texto para una línea por partida.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = GameRecordWriter(output) if output is not None else None
+    tasks = []
+    for pair in range((games + 1) // 2):
+        rng = random.Random(seed * 1000003 + pair)
+        board = random_setup(rng) if random_setups else standard_board()
+        opening = random_turns(rng, board, opening_turns) if opening_turns else []
+        for a_player in ("black", "white")[:games - 2 * pair]:
+            tasks.append((len(tasks), (engine_a, engine_b), a_player, board, opening, max_turns))
+    wins = losses = draws = 0
+    usage = (EngineUsage(), EngineUsage())
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, task) for task in tasks]
+        for future in as_completed(futures):
+            number, turns, result, game_usage = future.result()
+            a_player = tasks[number][2]
+            for total, part in zip(usage, game_usage):
+                total.add(part)
+            if result is None:
+                draws += 1
+                text = f"tablas tras {len(turns)} turnos"
+            else:
+                winner = engine_a if result.winner == a_player else engine_b
+                if winner is engine_a:
+                    wins += 1
+                else:
+                    losses += 1
+                text = f"gana {winner.name} ({result.winner}, {result.reason}) en {len(turns)} turnos"
+            if writer is not None:
+                writer.begin_game(tasks[number][3])
+                for player, codes in turns:
+                    writer.write_turn(player, codes)
+                if result is not None:
+                    writer.write_result(result)
+                output.flush()
+            if log is not None:
+                print(f"partida {number + 1}: {engine_a.name} con {a_player}, {text}  "
+                      f"[+{wins} -{losses} ={draws}]", file=log, flush=True)
+    return wins, losses, draws, usage
+
+
+def parse_weights(items):
+    """["MOBILITY_WEIGHT=0.3", ...] -> {"MOBILITY_WEIGHT": 0.3, ...}."""
+    weights = {}
+    for item in items or ():
+        name, _, value = item.partition("=")
+        try:
+            weights[name] = int(value) if value.lstrip("-").isdigit() else float(value)
+        except ValueError:
+            raise ValueError(f"Peso inválido: {item}") from None
+    return weights
+
+
+def report(engine_a, engine_b, wins, losses, draws, usage):
+    """Resumen de texto del enfrentamiento."""
+    games = wins + losses + draws
+    elo, margin = elo_estimate(wins, losses, draws)
+    score = (wins + draws / 2) / games if games else 0.0
+    lines = [f"{engine_a.name} contra {engine_b.name}: +{wins} -{losses} ={draws}  puntuación {score:.1%}  "
+             f"Elo {elo:+.0f} ± {margin:.0f}"]
+    for engine, part in zip((engine_a, engine_b), usage):
+        lines.append(f"  {engine.name}: {part.nps:.0f} nodos/s  {part.seconds_per_turn:.3f} s/turno  "
+                     f"{part.turns} turnos  {engine!r}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partidas del motor contra sí mismo entre dos configuraciones.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    parser.add_argument("--workers", type=int, help="procesos (por defecto, uno por CPU)")
+    parser.add_argument("--time", type=float, default=DEFAULT_TIME_LIMIT,
+                        help="segundos por turno (0: sin límite de tiempo)")
+    parser.add_argument("--depth", type=int, help="profundidad máxima en turnos")
+    parser.add_argument("--nodes", type=int, help="límite de nodos por turno")
+    parser.add_argument("--a", action="append", metavar="PESO=VALOR", help="peso de arimaa_eval del motor A")
+    parser.add_argument("--b", action="append", metavar="PESO=VALOR", help="peso de arimaa_eval del motor B")
+    parser.add_argument("--random-setup", action="store_true", help="colocaciones iniciales aleatorias")
+    parser.add_argument("--random-turns", type=int, default=0, help="turnos aleatorios de apertura")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="archivo de partidas (formato de arimaa_record)")
+    args = parser.parse_args()
+
+    budget = {"time_limit": args.time or None, "node_limit": args.nodes, "depth": args.depth}
+    try:
+        engine_a = EngineConfig("A", parse_weights(args.a), **budget)
+        engine_b = EngineConfig("B", parse_weights(args.b), **budget)
+    except ValueError as e:
+        parser.error(str(e))
+    output = open(args.output, "ab") if args.output else None
+    try:
+        results = run_match(engine_a, engine_b, args.games, args.workers, args.random_setup, args.random_turns,
+                            args.max_turns, args.seed, output, sys.stderr)
+    finally:
+        if output is not None:
+            output.close()
+    print(report(engine_a, engine_b, *results))
@@ -0,0 +1,102 @@
+# arimaa_transposition.py - Tabla de transposición de tamaño fijo para minimax
+
+EXACT = 0
+LOWER = 1  # El valor real es >= score (corte beta)
+UPPER = 2  # El valor real es <= score (falla baja)
+
+# Estimación de bytes por entrada: hueco en la lista, tupla de 6 campos, clave y score
+ENTRY_BYTES = 160
+DEFAULT_SIZE_MB = 16
+
+
+class TranspositionTable:
+    """Tabla con cubetas de dos entradas: una preferida por profundidad y otra de reemplazo siempre."""
+
+    def __init__(self, size_mb=DEFAULT_SIZE_MB, exact_depth_only=False):
+        buckets = 1
+        while buckets * 2 * ENTRY_BYTES * 2 <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.size_mb = size_mb
+        # Solo cortar con entradas de la misma profundidad: resultados reproducibles en paralelo
+        self.exact_depth_only = exact_depth_only
+        self.mask = buckets - 1
+        self.entries = [None] * (buckets * 2)
+        self.generation = 0
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Marca el inicio de una búsqueda: las entradas viejas pasan a ser reemplazables."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.entries = [None] * len(self.entries)
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """Devuelve la entrada (key, depth, flag, score, move, generation) o None."""
+        self.probes += 1
+        index = (key & self.mask) << 1
+        entries = self.entries
+        entry = entries[index]
+        if entry is None or entry[0] != key:
+            entry = entries[index + 1]
+            if entry is None or entry[0] != key:
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, score, move):
+        self.stores += 1
+        index = (key & self.mask) << 1
+        entries = self.entries
+        entry = (key, depth, flag, score, move, self.generation)
+        preferred = entries[index]
+        if preferred is None:
+            self.used += 1
+            entries[index] = entry
+            return
+        # Hueco preferido: misma posición, igual o más profundo, o de una búsqueda anterior
+        if preferred[0] == key or depth >= preferred[1] or preferred[5] != self.generation:
+            entries[index] = entry
+            if preferred[0] != key:
+                # La entrada desplazada pasa al hueco de reemplazo siempre
+                if entries[index + 1] is None:
+                    self.used += 1
+                entries[index + 1] = preferred
+            return
+        if entries[index + 1] is None:
+            self.used += 1
+        entries[index + 1] = entry
+
+    @property
+    def capacity(self):
+        return len(self.entries)
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def fill_level(self):
+        return self.used / len(self.entries)
+
+    def stats(self):
+        return {
+            "size_mb": self.size_mb,
+            "capacity": self.capacity,
+            "used": self.used,
+            "fill_level": self.fill_level(),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+        }
+
+    def report(self):
+        """Resumen de una línea para dimensionar la tabla."""
+        return (f"TT {self.size_mb} MB: {self.used}/{self.capacity} entradas "
+                f"({self.fill_level():.1%}), aciertos {self.hits}/{self.probes} ({self.hit_rate():.1%})")
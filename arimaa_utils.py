@@ -1,7 +1,6 @@
-piece_weights = {
-    "E": 5, "A": 4, "H": 3, "D": 2, "C": 1, "R": 0,
-    "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0
-}
+from arimaa_tables import ADJACENT, PIECE_STRENGTH, PIECE_COLOR
+
+piece_weights = PIECE_STRENGTH
 
 def is_frozen(board, position):
     row, col = position
@@ -9,32 +8,40 @@ def is_frozen(board, position):
     if not piece:
         return False
 
-    allies = set("RCDHEP" if piece.isupper() else "rcdhep")
-    enemies = set("rcdhep" if piece.isupper() else "RCDHEP")
-
-    has_ally = False
+    color = PIECE_COLOR[piece]
+    strength = PIECE_STRENGTH[piece]
     is_overpowered = False
-    
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        adj_row, adj_col = row + dr, col + dc
-        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
-            adj_piece = board[adj_row][adj_col]
-            if adj_piece:
-                if adj_piece in allies:
-                    has_ally = True
-                elif adj_piece in enemies and piece_weights[adj_piece] > piece_weights[piece]:
-                    is_overpowered = True
-
-    return is_overpowered and not has_ally
+
+    for adj_row, adj_col in ADJACENT[row][col]:
+        adj_piece = board[adj_row][adj_col]
+        if adj_piece:
+            if PIECE_COLOR[adj_piece] == color:
+                return False
+            if PIECE_STRENGTH[adj_piece] > strength:
+                is_overpowered = True
+
+    return is_overpowered
+
+def has_support(board, position):
+    """Verifica si una pieza en una posición tiene apoyo de aliados adyacentes."""
+    row, col = position
+    piece = board[row][col]
+    if not piece:
+        return False
+
+    color = PIECE_COLOR[piece]
+    for adj_row, adj_col in ADJACENT[row][col]:
+        adj_piece = board[adj_row][adj_col]
+        if adj_piece and PIECE_COLOR[adj_piece] == color:
+            return True
+    return False
 
 def is_enemy(piece, other):
-    return (piece.isupper() and other.islower()) or (piece.islower() and other.isupper())
+    return PIECE_COLOR[piece] != PIECE_COLOR[other]
 
 def get_piece_strength(piece):
     """Devuelve la fuerza de una pieza según las reglas de Arimaa."""
-    strength_order = {"E": 5, "C": 1, "H": 3, "D": 2, "A": 4, "R": 0,
-                      "e": 5, "c": 1, "h": 3, "d": 2, "a": 4, "r": 0}
-    return strength_order.get(piece.upper(), 0)
+    return PIECE_STRENGTH.get(piece, 0)
 
 def push_piece(board, pusher_pos, pushed_pos, new_pos):
     """Empuja una pieza enemiga a una nueva posición."""
@@ -0,0 +1,53 @@
+# bench_cold_start.py - Arranque en frío del motor sin interfaz gráfica
+#
+# Uso: python bench_cold_start.py [--runs N] [--target SEGUNDOS]
+# Cada ejecución es un intérprete nuevo que importa arimaa_game_logic y hace la
+# primera llamada a find_best_move desde la posición inicial. Se informa la
+# mediana de la importación, de la primera búsqueda y del total, y se comprueba
+# que pygame no se ha importado. Sale con código 1 si el total supera el objetivo.
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+COLD_START_TARGET = 0.05  # Segundos para import + primera find_best_move
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import arimaa_game_logic
+from arimaa_ai import find_best_move
+imported = time.perf_counter()
+game = arimaa_game_logic.ArimaaGame()
+find_best_move(game.board, "white")
+searched = time.perf_counter()
+print(json.dumps({"import": imported - start, "search": searched - imported,
+                  "pygame": "pygame" in sys.modules}))
+"""
+
+
+def measure(runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True)
+        samples.append(json.loads(output.stdout.splitlines()[-1]))
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arranque en frío: import + primera búsqueda.")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--target", type=float, default=COLD_START_TARGET)
+    args = parser.parse_args()
+
+    samples = measure(args.runs)
+    import_time = statistics.median(sample["import"] for sample in samples)
+    search_time = statistics.median(sample["search"] for sample in samples)
+    total = statistics.median(sample["import"] + sample["search"] for sample in samples)
+    pygame_loaded = any(sample["pygame"] for sample in samples)
+    print(f"import {import_time * 1000:.1f} ms  primera búsqueda {search_time * 1000:.1f} ms  "
+          f"total {total * 1000:.1f} ms  (objetivo {args.target * 1000:.0f} ms)")
+    if pygame_loaded:
+        print("FALLO: el motor importó pygame")
+    sys.exit(0 if total <= args.target and not pygame_loaded else 1)
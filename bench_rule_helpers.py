@@ -0,0 +1,263 @@
+# bench_rule_helpers.py - Micro-benchmark de las funciones de reglas antes/después de arimaa_tables
+#
+# Uso: python bench_rule_helpers.py [--positions N] [--repeat N]
+# Las versiones "antes" son copias de las funciones originales, que reconstruían
+# listas de direcciones, listas de trampas y conjuntos de piezas en cada llamada.
+import argparse
+import random
+import timeit
+
+import arimaa_ai
+import arimaa_utils
+from arimaa_bitboard import Position
+from arimaa_moves import new_move_buffer
+from arimaa_tables import NEIGHBOR_MASKS, TRAP_POSITIONS
+
+
+# --- Versiones originales -------------------------------------------------
+# Copias literales del código de partida, con sus rarezas (el conjunto de aliados
+# "RCDHEP" de is_frozen, la comprobación de filas y columnas de has_adjacent_ally).
+# Solo cambian los nombres: prefijo legacy_ y, en los métodos de ArimaaGame,
+# `board` en lugar de self.
+
+legacy_piece_weights = {
+    "E": 5, "A": 4, "H": 3, "D": 2, "C": 1, "R": 0,
+    "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0
+}
+
+def legacy_is_frozen(board, position):
+    row, col = position
+    piece = board[row][col]
+    if not piece:
+        return False
+
+    allies = set("RCDHEP" if piece.isupper() else "rcdhep")
+    enemies = set("rcdhep" if piece.isupper() else "RCDHEP")
+
+    has_ally = False
+    is_overpowered = False
+    
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        adj_row, adj_col = row + dr, col + dc
+        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
+            adj_piece = board[adj_row][adj_col]
+            if adj_piece:
+                if adj_piece in allies:
+                    has_ally = True
+                elif adj_piece in enemies and legacy_piece_weights[adj_piece] > legacy_piece_weights[piece]:
+                    is_overpowered = True
+
+    return is_overpowered and not has_ally
+
+def legacy_is_enemy(piece, other):
+    return (piece.isupper() and other.islower()) or (piece.islower() and other.isupper())
+
+def legacy_get_piece_strength(piece):
+    """Devuelve la fuerza de una pieza según las reglas de Arimaa."""
+    strength_order = {"E": 5, "C": 1, "H": 3, "D": 2, "A": 4, "R": 0,
+                      "e": 5, "c": 1, "h": 3, "d": 2, "a": 4, "r": 0}
+    return strength_order.get(piece.upper(), 0)
+
+
+def legacy_get_piece_at(board, position):
+    """Devuelve la pieza en una posición específica."""
+    row, col = position
+    if 0 <= row < 8 and 0 <= col < 8:
+        return board[row][col]
+    return None
+
+
+def legacy_has_support(board, position):
+    """Verifica si una pieza en una posición tiene apoyo de aliados adyacentes."""
+    row, col = position
+    piece = legacy_get_piece_at(board, position)
+    if not piece:
+        return False
+
+    allies = set("RCDHEA" if piece.isupper() else "rcdhea")
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        adj_row, adj_col = row + dr, col + dc
+        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
+            adj_piece = legacy_get_piece_at(board, (adj_row, adj_col))
+            if adj_piece in allies:
+                return True
+    return False
+
+
+def legacy_has_adjacent_ally(board, current_pos, new_pos, player):
+    current_row, current_col = current_pos
+    row, col = new_pos
+    for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
+        adj_row, adj_col = row + dr, col + dc
+        if 0 <= adj_row < 8 and 0 <= adj_col < 8 and adj_row != current_row and adj_col != current_col:
+            piece = board[adj_row][adj_col]
+            if piece:
+                if player == "white" and piece.islower():        
+                    return True
+                if player == "black" and piece.isupper():
+                    return True
+    return False
+
+def legacy_generate_push_pull_moves(board, position, piece):
+    push_pull_moves = []
+    strength = legacy_get_piece_strength(piece)
+    row, col = position
+    adjacent_positions = [(row + dr, col + dc) for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]]
+
+    for adj_row, adj_col in adjacent_positions:
+        if 0 <= adj_row < 8 and 0 <= adj_col < 8:
+            adjacent_piece = board[adj_row][adj_col]
+            if adjacent_piece and legacy_is_enemy(piece, adjacent_piece):
+                if legacy_get_piece_strength(adjacent_piece) < strength:
+                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                        new_row, new_col = adj_row + dr, adj_col + dc
+                        if (0 <= new_row < 8 and 0 <= new_col < 8 and 
+                            board[new_row][new_col] is None):
+                            score = legacy_evaluar_push_pull(board, (row, col), (new_row, new_col))
+                            if score > 0:
+                                push_pull_moves.append(("push", (row, col), (adj_row, adj_col), (new_row, new_col)))
+                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                        pull_row, pull_col = row + dr, col + dc
+                        if (0 <= pull_row < 8 and 0 <= pull_col < 8 and 
+                            board[pull_row][pull_col] is None):
+                            score = legacy_evaluar_push_pull(board, (row, col), (pull_row, pull_col))
+                            if score > 0:
+                                push_pull_moves.append(("pull", (row, col), (adj_row, adj_col), (pull_row, pull_col)))
+    return push_pull_moves
+
+def legacy_evaluar_push_pull(board, origin, destination):
+    score = 0
+    traps = [(2,2), (2,5), (5,2), (5,5)]
+    piece_values = {
+        "E": 5, "A": 4, "H": 3, "D": 2, "C": 1, "R": 0,  # Valores para piezas negras
+        "e": 5, "a": 4, "h": 3, "d": 2, "c": 1, "r": 0   # Valores para piezas blancas
+    }
+    
+    # Verificar si el destino es una trampa
+    if destination in traps:
+        # Simular el estado después del empuje/jalón
+        has_support = False
+        affected_piece = None
+        
+        # Obtener la pieza que será empujada/jalada
+        if len(origin) == 2:
+            affected_piece = board[origin[0]][origin[1]]
+        
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            adj_row, adj_col = destination[0] + dr, destination[1] + dc
+            if 0 <= adj_row < 8 and 0 <= adj_col < 8:
+                adj_piece = board[adj_row][adj_col]
+                if adj_piece and adj_piece.isupper() == affected_piece.isupper():
+                    has_support = True
+                    break
+        
+        # Si la pieza enemiga no tendrá apoyo en la trampa
+        if not has_support and affected_piece and affected_piece.islower():
+            # Bonus por eliminar una pieza enemiga, ponderado por su valor
+            piece_value = piece_values.get(affected_piece, 0)
+            score += piece_value * 3  # Triplicamos el valor de la eliminación
+            
+            # Bonus adicional por ser una trampa
+            score += 50
+    
+    # Mantener la evaluación existente
+    for trap in traps:
+        if legacy_manhattan_distance(destination, trap) < legacy_manhattan_distance(origin, trap):
+            score += 3
+    if 2 <= destination[0] <= 5 and 2 <= destination[1] <= 5:
+        score += 3
+        
+    return score
+
+def legacy_manhattan_distance(pos1, pos2):
+    return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+
+# --- Ayudas del benchmark -------------------------------------------------
+
+def legacy_generate_side_push_pull(board, player):
+    """Empujes y jalones de todas las piezas de `player` con legacy_generate_push_pull_moves.
+
+    No es código de partida: el generador original hacía este recorrido dentro de
+    generate_moves, junto con los pasos simples.
+    """
+    moves = []
+    for row in range(8):
+        for col in range(8):
+            piece = board[row][col]
+            if piece and piece.isupper() == (player == "black"):
+                moves.extend(legacy_generate_push_pull_moves(board, (row, col), piece))
+    return moves
+
+
+# --- Posiciones de prueba -------------------------------------------------
+
+def random_board(rng):
+    """Tablero aleatorio sin piezas sin apoyo en las trampas."""
+    board = [[None for _ in range(8)] for _ in range(8)]
+    pieces = list("RRRRRRRRCCDDHHAE" + "rrrrrrrrccddhhae")
+    rng.shuffle(pieces)
+    count = rng.randint(8, 32)
+    for sq, piece in zip(rng.sample(range(64), count), pieces):
+        board[sq // 8][sq % 8] = piece
+    for row, col in TRAP_POSITIONS:
+        if board[row][col] and not arimaa_utils.has_support(board, (row, col)):
+            board[row][col] = None
+    return board
+
+
+def build_cases(count, seed):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        board = random_board(rng)
+        position = Position.from_board(board)
+        occupied = [(r, c) for r in range(8) for c in range(8) if board[r][c]]
+        empty = [(r, c) for r in range(8) for c in range(8) if not board[r][c]]
+        origin = rng.choice(occupied)
+        target = rng.choice(empty)
+        cases.append((board, position, origin, target))
+    return cases
+
+
+def run(count, repeat):
+    cases = build_cases(count, seed=9)
+    player_of = lambda piece: "black" if piece.isupper() else "white"
+    buffer = new_move_buffer()
+
+    benchmarks = [
+        ("is_frozen",
+         lambda: [legacy_is_frozen(b, o) for b, _, o, _ in cases],
+         lambda: [arimaa_utils.is_frozen(b, o) for b, _, o, _ in cases]),
+        ("has_support",
+         lambda: [legacy_has_support(b, o) for b, _, o, _ in cases],
+         lambda: [arimaa_utils.has_support(b, o) for b, _, o, _ in cases]),
+        # has_adjacent_ally es ahora la prueba en línea de generate_move_codes
+        ("has_adjacent_ally",
+         lambda: [legacy_has_adjacent_ally(b, o, t, player_of(b[o[0]][o[1]])) for b, _, o, t in cases],
+         lambda: [bool(NEIGHBOR_MASKS[t[0] * 8 + t[1]] & p.occupied[p.squares[o[0] * 8 + o[1]] // 6]
+                       & ~(1 << (o[0] * 8 + o[1])))
+                  for _, p, o, t in cases]),
+        ("evaluar_push_pull",
+         lambda: [legacy_evaluar_push_pull(b, o, t) for b, _, o, t in cases],
+         lambda: [arimaa_ai.evaluar_push_pull(p, o[0] * 8 + o[1], t[0] * 8 + t[1]) for _, p, o, t in cases]),
+        # generate_move_codes genera por bando y además incluye los pasos simples
+        ("push/pull del bando",
+         lambda: [legacy_generate_side_push_pull(b, player_of(b[o[0]][o[1]])) for b, _, o, _ in cases],
+         lambda: [arimaa_ai.generate_move_codes(p, player_of(p.piece_at(o[0] * 8 + o[1])), buffer)
+                  for _, p, o, _ in cases]),
+    ]
+
+    print(f"{'función':<26}{'antes (ns)':>12}{'después (ns)':>14}{'mejora':>9}")
+    for name, before, after in benchmarks:
+        before_time = min(timeit.repeat(before, number=1, repeat=repeat)) / count * 1e9
+        after_time = min(timeit.repeat(after, number=1, repeat=repeat)) / count * 1e9
+        print(f"{name:<26}{before_time:>12.0f}{after_time:>14.0f}{before_time / after_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coste por llamada de las funciones de reglas.")
+    parser.add_argument("--positions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.positions, args.repeat)